@@ -1,12 +1,230 @@
 # config_loader.py - Loads and merges parameters
 
 import os
+import json
 import yaml
 import logging
 from typing import Dict, Any, Optional
 
+# Prefer the libyaml-backed loader when PyYAML was built with it (same safety semantics as SafeLoader)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 logger = logging.getLogger('skeo.config')
 
+# Defaults taken from environment variables when set, as (parameter path, variable). Read on every
+# load_params call, so variables set (or loaded from .env) after this module is imported still apply
+_ENV_DEFAULTS = (
+    (("llm", "api_key"), "LLM_API_KEY"),
+    (("pdf", "section_cache_dir"), "SKEO_LLM_CACHE"),
+    (("pdf", "docling_options", "artifacts_path"), "DOCLING_ARTIFACTS_PATH"),
+    (("metadata", "serpapi_api_key"), "SERPAPI_API_KEY"),
+    (("strapi", "url"), "STRAPI_URL"),
+    (("strapi", "token"), "STRAPI_API_TOKEN"),
+)
+
+def _read_params_file(params_file: str) -> Any:
+    """
+    Parse a parameters YAML file, reusing a JSON sidecar cache when it is up to date.
+
+    The cache ('<params_file>.cache.json') holds only the parsed file contents, never the
+    merged parameters, so values pulled from environment variables are not written to disk.
+    It is refreshed whenever the YAML file is newer than the cache.
+    """
+    cache_path = params_file + ".cache.json"
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(params_file):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                custom_params = json.load(f)
+            logger.debug(f"Loaded cached parameters from {cache_path}")
+            return custom_params
+    except (OSError, ValueError):
+        pass # No usable cache (missing, stale check failed, or corrupt); parse the YAML instead
+
+    with open(params_file, 'r', encoding='utf-8') as f:
+        custom_params = yaml.load(f, Loader=_YamlLoader)
+
+    # Only cache content that survives a JSON round trip unchanged (e.g. no dates or non-string keys)
+    if isinstance(custom_params, dict):
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            serialized = json.dumps(custom_params)
+            if json.loads(serialized) == custom_params:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(serialized)
+                os.replace(tmp_path, cache_path) # Atomic swap so readers never see a partial file
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"Could not write parameter cache {cache_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    return custom_params
+
+# Default parameters including API slugs and paths. Built once; load_params hands out clones (see _default_params)
+_DEFAULT_PARAMS = {
+    "llm": {
+        "api_endpoint": "https://api.openai.com", # Base URL
+        "api_key": None, # LLM_API_KEY env var by default
+        "model": "gpt-4-1106-preview",
+        "api_base_path": "/v1", # Base path for API calls
+        "chat_endpoint": "/chat/completions", # Specific chat endpoint
+        "health_endpoint": None, # Health check endpoint often unused
+        "max_tokens": 4096,
+        "temperature": 0.2,
+        "retry_attempts": 3,
+        "timeout_seconds": 120,
+        "validation_mode": "strict" # strict or lenient
+    },
+    "pdf": {
+        "extract_method": "docling", # 'docling', 'pymupdf' or 'pdftotext' (Poppler binary; plain text only)
+        "search_metadata": True,
+        "prefetch_metadata": False, # Batch SerpApi lookups of embedded PDF titles before processing (may spend extra queries)
+        "speculative_metadata_search": False, # Look up a first-page-confirmed embedded title while Docling runs (may spend extra queries)
+        "max_text_length": 150000,
+        "extract_workers": 2, # Threads for blocking Docling work (kept small; Docling parallelizes internally). PyMuPDF always uses one thread
+        "torch_threads": None, # Cap torch intra-op threads per process; None keeps torch's default
+        "language_detection": True,
+        "section_cache_dir": "~/.cache/skeo/llm", # SKEO_LLM_CACHE env var overrides; on-disk cache of LLM section-inference responses (None disables)
+        "section_cache_ttl_days": 30, # Cached responses older than this are ignored (None: never expire)
+        "section_window_chars": 6000, # LLM section inference sees this much text after each section heading (0: full text)
+        "section_batch_size": 1, # >1 lets up to this many concurrently processed PDFs share one section-inference LLM call
+        "section_batch_max_chars": 60000, # Max combined text per batched call (larger documents are sent alone)
+        "section_batch_wait_ms": 50, # How long a request waits for others to join its batch
+        "language_model_path": None, # fastText lid.176.ftz/.bin path; langdetect is used when unset
+        "language_detection_languages": ['en', 'es', 'ar', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-cn', 'zh-tw', 'hi', 'bn', 'id'], # langdetect profiles to load (empty/None loads all)
+        # Docling specific options
+        "docling_options": {
+            "max_num_pages": None, # No limit by default
+            "max_file_size": None, # No limit by default
+            "artifacts_path": None, # DOCLING_ARTIFACTS_PATH env var by default
+            "enable_remote_services": False, # Default to False for privacy
+            # Enrichment options (disabled by default)
+            "do_code_enrichment": False,
+            "do_formula_enrichment": False,
+            "do_picture_classification": False,
+            "do_picture_description": False,
+            "generate_picture_images": False, # Required for picture classification/description
+            "images_scale": 2,
+            # Table structure options
+            "do_table_structure": True,
+            "table_structure_mode": "ACCURATE", # ACCURATE or FAST
+            "table_do_cell_matching": True, # Map back to PDF cells
+            # Threaded pipeline (newer Docling): batches pages through layout/table models concurrently
+            "process_workers": 0, # >0 runs conversions in that many worker processes (each loads its own models)
+            "use_threaded_pipeline": False,
+            "page_batch_size": None, # Docling settings.perf override; None keeps Docling's default
+            "page_batch_concurrency": None, # Docling settings.perf override; None keeps Docling's default
+        }
+    },
+    "metadata": {
+        # SerpApi Google Scholar configuration
+        "serpapi_api_key": None, # SERPAPI_API_KEY env var by default
+        "serpapi_max_concurrency": 8, # Max in-flight SerpApi requests (also the connection pool size)
+        "serpapi_min_title_similarity": 0.6, # Reject top results whose title is less similar than this (0 disables)
+        "cache_file": "~/.cache/skeo/serpapi_cache.sqlite", # Persistent SerpApi query cache (None disables)
+        "cache_ttl_days": 30, # Cached results (including "no match") expire after this many days
+        "serpapi_google_scholar_params": { # Default parameters for Google Scholar searches
+            "hl": "en", # Language: English
+            "num": 10, # Number of results per page (max 20)
+            "as_vis": "0", # Include citations (default)
+            "as_ylo": None, # Optional: Start year filter
+            "as_yhi": None, # Optional: End year filter
+        }
+    },
+    "extraction": {
+        "confidence_threshold": 0.6, # Filtering based on this is currently manual
+        "extract_components": [ # Components to attempt extraction for
+            "research_context", "theoretical_basis", "research_problem",
+            "knowledge_gap", "research_question", "future_direction",
+            "potential_application", "scientific_challenge",
+            "methodological_challenge", "implementation_challenge",
+            "limitation", "methodological_framework",
+            "material_tool"
+        ],
+    },
+    "processing": {
+        "max_workers": 4, # Controls asyncio semaphore for concurrency
+        "fail_fast": False,
+        "skip_existing": True # Skip generating output JSON if it exists
+    },
+    "output": {
+        "verbose_output": True # Controls some logging detail
+    },
+    "strapi": {
+        "url": "http://localhost:1337", # STRAPI_URL env var overrides
+        "token": None, # STRAPI_API_TOKEN env var by default
+        "api_base_path": "/api", # Strapi API base path
+        "direct_upload": False,
+        "upload_batch_size": 20, # Conceptual, currently uploads one by one
+        "test_endpoints": True,
+        "retry_failed_uploads": False, # Complex dependency retry logic not implemented
+        "api_slugs": { # Mapping from internal key to Strapi API ID (plural)
+            "scientific_paper": "sciknow-25x1-scientific-papers",
+            "research_context": "sciknow-25x1-research-contexts",
+            "theoretical_basis": "sciknow-25x1-theoretical-bases",
+            "research_problem": "sciknow-25x1-research-problems",
+            "knowledge_gap": "sciknow-25x1-knowledge-gaps",
+            "research_question": "sciknow-25x1-research-questions",
+            "future_direction": "sciknow-25x1-future-directions",
+            "potential_application": "sciknow-25x1-potential-applications",
+            "scientific_challenge": "sciknow-25x1-scientific-challenges",
+            "methodological_challenge": "sciknow-25x1-methodological-challenges",
+            "implementation_challenge": "sciknow-25x1-implementation-challenges",
+            "limitation": "sciknow-25x1-limitations",
+            "methodological_framework": "sciknow-25x1-methodological-frameworks",
+            "material_tool": "sciknow-25x1-material-tools",
+            # Add slugs for components if used
+        }
+    }
+}
+
+def _clone_params(value: Any) -> Any:
+    """Copy nested dicts/lists of plain values; cheaper than copy.deepcopy for parameter trees."""
+    if isinstance(value, dict):
+        return {k: _clone_params(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone_params(v) for v in value]
+    return value
+
+def _default_params() -> Dict[str, Any]:
+    """Fresh copy of _DEFAULT_PARAMS with the _ENV_DEFAULTS variables that are currently set applied."""
+    params = _clone_params(_DEFAULT_PARAMS)
+    for path, env_var in _ENV_DEFAULTS:
+        value = os.getenv(env_var)
+        if value is not None:
+            section = params
+            for key in path[:-1]:
+                section = section[key]
+            section[path[-1]] = value
+    return params
+
+_MISSING = object()
+
+def _merge_dicts(base: Dict[str, Any], overlay: Dict[str, Any]) -> None:
+    """
+    Merge overlay into base in place, descending into nested dicts.
+
+    Uses an explicit stack instead of recursion. None values in overlay do not
+    overwrite existing defaults unless the default was also None.
+    """
+    stack = [(base, overlay)]
+    while stack:
+        b, o = stack.pop()
+        # Partition in one pass: dict-on-dict entries are descended into, the rest is applied with one update()
+        updates = {}
+        for k, v in o.items():
+            bv = b.get(k, _MISSING)
+            if isinstance(v, dict) and isinstance(bv, dict):
+                stack.append((bv, v))
+            elif v is not None or bv is None or bv is _MISSING:
+                updates[k] = v # New keys (including whole new subtrees) are taken as-is
+        if updates:
+            b.update(updates)
+
 def load_params(params_file: Optional[str] = None) -> Dict[str, Any]:
     """
     Load parameters from YAML file, merging with defaults.
@@ -17,128 +235,17 @@ def load_params(params_file: Optional[str] = None) -> Dict[str, Any]:
     Returns:
         Dict containing parameters.
     """
-    # Define default parameters including API slugs and paths
-    default_params = {
-        "llm": {
-            "api_endpoint": "https://api.openai.com", # Base URL
-            "api_key": os.getenv("LLM_API_KEY"), # Get from env var by default
-            "model": "gpt-4-1106-preview",
-            "api_base_path": "/v1", # Base path for API calls
-            "chat_endpoint": "/chat/completions", # Specific chat endpoint
-            "health_endpoint": None, # Health check endpoint often unused
-            "max_tokens": 4096,
-            "temperature": 0.2,
-            "retry_attempts": 3,
-            "timeout_seconds": 120,
-            "validation_mode": "strict" # strict or lenient
-        },
-        "pdf": {
-            "extract_method": "docling", # 'docling' or 'pymupdf'
-            "search_metadata": True,
-            "max_text_length": 150000,
-            "language_detection": True,
-            # Docling specific options
-            "docling_options": {
-                "max_num_pages": None, # No limit by default
-                "max_file_size": None, # No limit by default
-                "artifacts_path": os.getenv("DOCLING_ARTIFACTS_PATH"), # Allow overriding via env var
-                "enable_remote_services": False, # Default to False for privacy
-                # Enrichment options (disabled by default)
-                "do_code_enrichment": False,
-                "do_formula_enrichment": False,
-                "do_picture_classification": False,
-                "do_picture_description": False,
-                "generate_picture_images": False, # Required for picture classification/description
-                "images_scale": 2,
-                # Table structure options
-                "do_table_structure": True,
-                "table_structure_mode": "ACCURATE", # ACCURATE or FAST
-                "table_do_cell_matching": True, # Map back to PDF cells
-            }
-        },
-        "metadata": {
-            # SerpApi Google Scholar configuration
-            "serpapi_api_key": os.getenv("SERPAPI_API_KEY"), # Get from env var
-            "serpapi_google_scholar_params": { # Default parameters for Google Scholar searches
-                "hl": "en", # Language: English
-                "num": 10, # Number of results per page (max 20)
-                "as_vis": "0", # Include citations (default)
-                "as_ylo": None, # Optional: Start year filter
-                "as_yhi": None, # Optional: End year filter
-            }
-        },
-        "extraction": {
-            "confidence_threshold": 0.6, # Filtering based on this is currently manual
-            "extract_components": [ # Components to attempt extraction for
-                "research_context", "theoretical_basis", "research_problem",
-                "knowledge_gap", "research_question", "future_direction",
-                "potential_application", "scientific_challenge",
-                "methodological_challenge", "implementation_challenge",
-                "limitation", "methodological_framework",
-                "material_tool"
-            ],
-        },
-        "processing": {
-            "max_workers": 4, # Controls asyncio semaphore for concurrency
-            "fail_fast": False,
-            "skip_existing": True # Skip generating output JSON if it exists
-        },
-        "output": {
-            "verbose_output": True # Controls some logging detail
-        },
-        "strapi": {
-            "url": os.getenv("STRAPI_URL", "http://localhost:1337"),
-            "token": os.getenv("STRAPI_API_TOKEN"), # Get from env var by default
-            "api_base_path": "/api", # Strapi API base path
-            "direct_upload": False,
-            "upload_batch_size": 20, # Conceptual, currently uploads one by one
-            "test_endpoints": True,
-            "retry_failed_uploads": False, # Complex dependency retry logic not implemented
-            "api_slugs": { # Mapping from internal key to Strapi API ID (plural)
-                "scientific_paper": "sciknow-25x1-scientific-papers",
-                "research_context": "sciknow-25x1-research-contexts",
-                "theoretical_basis": "sciknow-25x1-theoretical-bases",
-                "research_problem": "sciknow-25x1-research-problems",
-                "knowledge_gap": "sciknow-25x1-knowledge-gaps",
-                "research_question": "sciknow-25x1-research-questions",
-                "future_direction": "sciknow-25x1-future-directions",
-                "potential_application": "sciknow-25x1-potential-applications",
-                "scientific_challenge": "sciknow-25x1-scientific-challenges",
-                "methodological_challenge": "sciknow-25x1-methodological-challenges",
-                "implementation_challenge": "sciknow-25x1-implementation-challenges",
-                "limitation": "sciknow-25x1-limitations",
-                "methodological_framework": "sciknow-25x1-methodological-frameworks",
-                "material_tool": "sciknow-25x1-material-tools",
-                # Add slugs for components if used
-            }
-        }
-    }
-
-    # Function to recursively merge dictionaries
-    def merge_dicts(base, overlay):
-        for k, v in overlay.items():
-            if k in base and isinstance(base[k], dict) and isinstance(v, dict):
-                merge_dicts(base[k], v)
-            else:
-                # Override or add new key, only if value is not None
-                # This prevents None values in custom_params from overwriting defaults
-                # unless the default was also None.
-                if v is not None or base.get(k) is None:
-                    base[k] = v
-
-
     if params_file:
         logger.info(f"Loading parameters from: {params_file}")
         try:
-            with open(params_file, 'r', encoding='utf-8') as f:
-                custom_params = yaml.safe_load(f)
-                if not isinstance(custom_params, dict):
-                    logger.warning(f"Parameter file {params_file} is not a valid dictionary. Using defaults.")
-                    return default_params
-
-            # Start with defaults and merge custom params on top
-            merged_params = default_params.copy() # Deep copy? Not strictly needed if merge_dicts handles it
-            merge_dicts(merged_params, custom_params)
+            custom_params = _read_params_file(params_file)
+            if not isinstance(custom_params, dict):
+                logger.warning(f"Parameter file {params_file} is not a valid dictionary. Using defaults.")
+                return _default_params()
+
+            # Start with a fresh copy of the defaults and merge custom params on top
+            merged_params = _default_params()
+            _merge_dicts(merged_params, custom_params)
             logger.info("Successfully merged custom parameters.")
             return merged_params
 
@@ -152,12 +259,5 @@ def load_params(params_file: Optional[str] = None) -> Dict[str, Any]:
     else:
          logger.info("No parameter file specified. Using default parameters.")
 
-    # Ensure API keys from environment are loaded if not overridden by file
-    if not default_params["llm"]["api_key"]:
-        default_params["llm"]["api_key"] = os.getenv("LLM_API_KEY")
-    if not default_params["metadata"]["serpapi_api_key"]:
-        default_params["metadata"]["serpapi_api_key"] = os.getenv("SERPAPI_API_KEY")
-    if not default_params["strapi"]["token"]:
-        default_params["strapi"]["token"] = os.getenv("STRAPI_API_TOKEN")
-
-    return default_params
\ No newline at end of file
+    # Callers mutate the returned dict (e.g. CLI overrides), so never hand out _DEFAULT_PARAMS itself
+    return _default_params()
\ No newline at end of file
@@ -2,16 +2,76 @@
 
 import os
 import json
-import re
 import asyncio
 import aiohttp
 import logging
 from typing import Dict, List, Any, Optional, Union
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_fixed, wait_exponential_jitter, retry_if_exception_type, AsyncRetrying
 from pydantic import ValidationError
+try:
+    from pydantic import TypeAdapter # Pydantic v2+
+except ImportError:
+    TypeAdapter = None
+
+# Prefer orjson for request/response (de)serialization; fall back to the stdlib
+try:
+    import orjson
+    _dumps = orjson.dumps # Returns bytes
+    _loads = orjson.loads # Raises orjson.JSONDecodeError, a json.JSONDecodeError subclass
+except ImportError:
+    _dumps = lambda obj: json.dumps(obj).encode('utf-8')
+    _loads = json.loads
 
 logger = logging.getLogger('skeo.llm')
 
+# Failures worth another extract_json attempt: bad/invalid JSON (JSONDecodeError and
+# ValidationError are ValueError subclasses) and timeouts. Transport errors are not listed:
+# generate_response already retries those, and retrying them here too would multiply the attempts
+_RETRYABLE_EXTRACT_ERRORS = (ValidationError, ValueError, asyncio.TimeoutError)
+# Expected ways for extraction to fail definitively, logged without a traceback
+_EXTRACT_FAILURES = _RETRYABLE_EXTRACT_ERRORS + (aiohttp.ClientError,)
+_MAX_CORRECTION_CHARS = 1024 # Cap on error text echoed back to the model on retry
+
+_JSON_INSTRUCTION = "\n\nImportant: Respond ONLY with valid, parseable JSON. Do not include any introductory text, explanations, apologies, or markdown formatting like ```json ... ``` around the JSON object/array."
+
+# Schema instruction text per Pydantic model class; schemas are static, so build each one once per process
+_SCHEMA_CACHE: Dict[type, str] = {}
+
+def _schema_instruction(schema_model) -> str:
+    """Return the (cached) prompt sentence carrying the JSON schema of a Pydantic model class."""
+    instruction = _SCHEMA_CACHE.get(schema_model)
+    if instruction is None:
+        try:
+            schema_info = _dumps(schema_model.model_json_schema()).decode('utf-8') # Pydantic v2+
+        except AttributeError: # Fallback for older Pydantic
+            logger.warning(f"Using schema_json() fallback for model {schema_model.__name__}")
+            schema_info = schema_model.schema_json()
+        instruction = _SCHEMA_CACHE[schema_model] = f"\n\nThe JSON response MUST conform strictly to this Pydantic JSON schema: {schema_info}"
+    return instruction
+
+# TypeAdapter(list[Model]) per Pydantic model class, reused across calls
+_LIST_ADAPTERS: Dict[type, Any] = {}
+
+def _list_adapter(schema_model):
+    """Return the (cached) list validator for a Pydantic model class."""
+    adapter = _LIST_ADAPTERS.get(schema_model)
+    if adapter is None:
+        if TypeAdapter is None:
+            raise AttributeError("TypeAdapter requires Pydantic v2") # Handled by the v1 fallback in extract_json
+        adapter = _LIST_ADAPTERS[schema_model] = TypeAdapter(List[schema_model])
+    return adapter
+
+def _strip_code_fences(text: str) -> str:
+    """Strip surrounding whitespace and an optional ```/```json markdown fence from an LLM response."""
+    s = text.strip()
+    if s.startswith("```json"):
+        s = s[7:].lstrip()
+    elif s.startswith("```"):
+        s = s[3:].lstrip()
+    if s.endswith("```"):
+        s = s[:-3].rstrip()
+    return s
+
 class LLMClient:
     """Client for interacting with LLM via HTTP API (using aiohttp)"""
 
@@ -49,11 +109,58 @@ class LLMClient:
         self.timeout_seconds = llm_params.get('timeout_seconds', 120)
         self.validation_mode = llm_params.get('validation_mode', "strict") # strict or lenient
 
+        # Handle potential variations in API base/path structure (computed once, not per request)
+        api_base = self.api_base.rstrip('/')
+        api_path = self.api_base_path.strip('/')
+        chat_path = self.chat_endpoint.lstrip('/')
+        self._chat_url = f"{api_base}/{api_path}/{chat_path}" if api_path else f"{api_base}/{chat_path}"
+        self._base_payload = {"model": self.model}
+        self._timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+        self._suffix_cache: Dict[Any, str] = {} # schema_model (or None) -> prompt suffix
+
+        # Shared HTTP session (created lazily inside the running event loop) for keep-alive and pooling
+        # Each of the max_workers PDFs in flight fans out one request per extraction component,
+        # so size the pool for that peak rather than letting the connector queue requests
+        max_workers = params.get('processing', {}).get('max_workers', 4) if params else 4
+        num_components = len(params.get('extraction', {}).get('extract_components') or []) if params else 0
+        self._concurrency = max(1, max_workers * max(1, num_components))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock: Optional[asyncio.Lock] = None
+
         # Run connection check asynchronously if needed (or just log config)
         logger.info(f"LLM Client configured: endpoint={self.api_base}, model={self.model}")
         # Consider adding an async check method to be called externally if needed:
         # asyncio.run(self._check_connection()) # Avoid running async in __init__
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared aiohttp session, creating it on first use."""
+        if self._session is not None and not self._session.closed:
+            return self._session
+        if self._session_lock is None:
+            self._session_lock = asyncio.Lock()
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self._concurrency,
+                    limit_per_host=self._concurrency, # All traffic goes to the one LLM host
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60,
+                    enable_cleanup_closed=True # Don't let half-closed TLS sockets linger in long batch runs
+                )
+                self._session = aiohttp.ClientSession(
+                    headers=self.base_headers,
+                    timeout=self._timeout,
+                    connector=connector
+                )
+                logger.debug(f"Created shared LLM HTTP session (connection limit {self._concurrency})")
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session. Safe to call more than once."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     async def _check_connection(self):
         """Verify LLM API connection with a test prompt (optional, call externally)"""
         logger.info("Verifying LLM API connection...")
@@ -79,35 +186,28 @@ class LLMClient:
         temperature = temperature if temperature is not None else self.temperature
 
         payload = {
-            "model": self.model,
+            **self._base_payload,
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": max_tokens,
             "temperature": temperature
         }
-        # Handle potential variations in API base/path structure
-        api_base = self.api_base.rstrip('/')
-        api_path = self.api_base_path.strip('/')
-        chat_path = self.chat_endpoint.lstrip('/')
-        url = f"{api_base}/{api_path}/{chat_path}" if api_path else f"{api_base}/{chat_path}"
-
-        request_timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+        url = self._chat_url
 
         try:
-            async with aiohttp.ClientSession(headers=self.base_headers, timeout=request_timeout) as session:
-                async with session.post(url, json=payload) as response:
+            session = await self._get_session()
+            async with session.post(url, data=_dumps(payload)) as response: # Content-Type set in base_headers
+                if response.status >= 400:
+                    # Read the error body while the response is still open, and only if it will be logged
+                    if logger.isEnabledFor(logging.ERROR):
+                        error_body = await response.read()
+                        logger.error("LLM API Error (HTTP %d) for URL %s: %.500s", response.status, url, error_body.decode('utf-8', 'replace'))
                     response.raise_for_status()
-                    response_data = await response.json()
-                    if not response_data.get("choices") or not response_data["choices"][0].get("message"):
-                         raise ValueError("Invalid response structure from LLM API")
-                    return response_data["choices"][0]["message"]["content"]
-        except aiohttp.ClientResponseError as e:
-            logger.error(f"LLM API Error (HTTP {e.status}): {e.message} for URL {url}")
-            try:
-                error_body = await e.response.text()
-                logger.error(f"LLM Error Body: {error_body[:500]}") # Log beginning of error body
-            except Exception:
-                 pass # Ignore errors reading the body
-            raise
+                response_data = _loads(await response.read())
+                if not response_data.get("choices") or not response_data["choices"][0].get("message"):
+                     raise ValueError("Invalid response structure from LLM API")
+                return response_data["choices"][0]["message"]["content"]
+        except aiohttp.ClientResponseError:
+            raise # Already logged above with the response body
         except asyncio.TimeoutError:
             logger.error(f"LLM API request timed out after {self.timeout_seconds} seconds for URL {url}.")
             raise
@@ -115,124 +215,154 @@ class LLMClient:
             logger.error(f"LLM API connection error to {url}: {e}")
             raise
         except Exception as e:
-            logger.error(f"Unexpected error calling LLM API at {url}: {str(e)}", exc_info=True)
+            # No traceback here: this runs once per attempt, and the caller logs the final failure with exc_info
+            logger.warning("Unexpected error calling LLM API at %s: %s", url, e)
             raise
 
+    def _prompt_suffix(self, schema_model=None) -> str:
+        """Return the JSON format (and, in strict mode, schema) instructions appended to extraction prompts."""
+        suffix = self._suffix_cache.get(schema_model)
+        if suffix is None:
+            suffix = _JSON_INSTRUCTION
+            if schema_model and self.validation_mode == "strict":
+                try:
+                    suffix += _schema_instruction(schema_model)
+                except Exception as schema_err:
+                    logger.warning(f"Could not generate JSON schema for model {schema_model.__name__}: {schema_err}")
+            self._suffix_cache[schema_model] = suffix
+        return suffix
+
     async def extract_json(self, prompt: str, schema_model=None) -> Optional[Union[Dict, List[Dict]]]:
         """
-        Extract structured JSON data using the LLM, with schema validation and retries.
+        Extract structured JSON data using the LLM, with optional schema validation and retries.
 
         Args:
             prompt (str): The prompt instructing JSON extraction
             schema_model: Optional Pydantic model for validation
 
         Returns:
-            Optional[Union[Dict, List[Dict]]]: The extracted and validated JSON data, or None if extraction fails definitively.
+            Optional[Union[Dict, List[Dict]]]: The extracted (and validated) JSON data, or None if extraction fails definitively.
         """
-        current_prompt = prompt
-        last_error = None
+        if schema_model is None:
+            return await self.extract_json_raw(prompt)
+        return await self.extract_json_validated(prompt, schema_model)
 
-        for attempt in range(self.retry_attempts):
-            logger.info(f"Attempting LLM JSON extraction (Attempt {attempt+1}/{self.retry_attempts})")
-            try:
-                # Add schema/format instructions on each attempt
-                json_prompt = f"{current_prompt}\n\nImportant: Respond ONLY with valid, parseable JSON. Do not include any introductory text, explanations, apologies, or markdown formatting like ```json ... ``` around the JSON object/array."
+    async def extract_json_raw(self, prompt: str) -> Optional[Union[Dict, List]]:
+        """
+        Extract JSON using the LLM without schema validation.
 
-                if schema_model and self.validation_mode == "strict":
-                    try:
-                        # Use model_json_schema() for Pydantic v2+
-                        schema_info = json.dumps(schema_model.model_json_schema())
-                        json_prompt += f"\n\nThe JSON response MUST conform strictly to this Pydantic JSON schema: {schema_info}"
-                    except AttributeError: # Fallback for older Pydantic or potential issues
-                         logger.warning(f"Using schema_json() fallback for model {schema_model.__name__}")
-                         try:
-                              schema_info = schema_model.schema_json()
-                              json_prompt += f"\n\nThe JSON response MUST conform strictly to this Pydantic schema: {schema_info}"
-                         except Exception as schema_err:
-                              logger.warning(f"Could not generate JSON schema for model {schema_model.__name__}: {schema_err}")
-                    except Exception as schema_err:
-                        logger.warning(f"Could not generate JSON schema for model {schema_model.__name__}: {schema_err}")
-
-                response_str = await self.generate_response(json_prompt, temperature=0.1)
-                logger.debug(f"LLM JSON attempt {attempt+1} raw response: {response_str[:500]}...")
-
-                json_data = None
-                # Attempt to parse JSON directly first
-                try:
-                    # Strip potential markdown backticks and 'json' language identifier
-                    clean_response = re.sub(r'^```(?:json)?\s*|\s*```$', '', response_str.strip(), flags=re.DOTALL)
-                    json_data = json.loads(clean_response)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Direct JSON parse failed (attempt {attempt+1}): {e}. Raw response: {response_str[:200]}")
-                    last_error = f"Invalid JSON: {e}"
-                    current_prompt += f"\n\nYour previous response was not valid JSON. Please provide only the raw JSON object/array. Error: {e}"
-                    continue # Go to next retry attempt
-
-                # Validate against schema if provided
-                if schema_model:
-                    try:
-                        if isinstance(json_data, list):
-                            # Use model_validate for Pydantic v2+
-                            validated_data = [schema_model.model_validate(item) for item in json_data]
-                            logger.info(f"Successfully extracted and validated list of {len(validated_data)} {schema_model.__name__} items.")
-                            return [item.model_dump(exclude_unset=True) for item in validated_data]
-                        elif isinstance(json_data, dict):
-                             validated_data = schema_model.model_validate(json_data)
-                             logger.info(f"Successfully extracted and validated {schema_model.__name__}.")
-                             return validated_data.model_dump(exclude_unset=True)
-                        else:
-                            raise ValidationError(f"Expected JSON object or list, got {type(json_data)}", model=schema_model)
+        Invalid JSON, invalid response structure and timeouts are retried here; transport errors
+        (aiohttp.ClientError) are retried by generate_response itself.
 
-                    except ValidationError as ve:
-                        last_error = f"Schema validation failed: {str(ve)}"
-                        logger.warning(f"Schema validation error (attempt {attempt+1}/{self.retry_attempts}): {str(ve)}")
-                        if self.validation_mode == "strict":
-                            current_prompt += f"\n\nYour previous response had validation errors against the schema: {str(ve)}\nPlease fix them and ensure conformance to the required schema."
-                            continue # Go to next retry attempt
-                        else: # Lenient mode
-                            logger.warning(f"Schema validation errors ignored in lenient mode.")
-                            return json_data # Return raw data despite errors
-                    except AttributeError: # Handle Pydantic v1 fallback if needed
-                         logger.warning("Attempting Pydantic v1 validation fallback (parse_obj).")
-                         try:
-                              if isinstance(json_data, list):
-                                   validated_data = [schema_model.parse_obj(item) for item in json_data]
-                                   logger.info(f"Successfully extracted and validated list of {len(validated_data)} {schema_model.__name__} items (v1).")
-                                   return [item.dict(exclude_unset=True) for item in validated_data]
-                              elif isinstance(json_data, dict):
-                                   validated_data = schema_model.parse_obj(json_data)
-                                   logger.info(f"Successfully extracted and validated {schema_model.__name__} (v1).")
-                                   return validated_data.dict(exclude_unset=True)
-                         except ValidationError as ve_v1:
-                              last_error = f"Schema validation failed (v1 fallback): {str(ve_v1)}"
-                              logger.warning(f"Schema validation error (v1 fallback, attempt {attempt+1}): {str(ve_v1)}")
-                              if self.validation_mode == "strict":
-                                   current_prompt += f"\n\nYour previous response had validation errors against the schema (v1): {str(ve_v1)}\nPlease fix them."
-                                   continue
-                              else:
-                                   return json_data # Lenient mode
-
-
-                else:
-                    # No schema provided, return parsed JSON
+        Args:
+            prompt (str): The prompt instructing JSON extraction
+
+        Returns:
+            Optional[Union[Dict, List]]: The parsed JSON data, or None if extraction fails definitively.
+        """
+        prompt_suffix = self._prompt_suffix()
+        correction: List[str] = [] # Feedback on the latest failed attempt (at most one entry), appended to the next prompt
+
+        try:
+            async for attempt in self._retrying(_RETRYABLE_EXTRACT_ERRORS):
+                with attempt:
+                    json_data = await self._request_json(prompt, prompt_suffix, correction, attempt.retry_state.attempt_number)
                     logger.info("Successfully extracted JSON (no schema validation requested).")
                     return json_data
+        except _EXTRACT_FAILURES as e:
+            logger.error(f"Failed to extract JSON after {self.retry_attempts} attempts. Last error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to extract JSON due to unexpected error: {str(e)}", exc_info=True)
+        return None # Indicate definitive failure
+
+    async def extract_json_validated(self, prompt: str, schema_model) -> Optional[Union[Dict, List[Dict]]]:
+        """
+        Extract JSON using the LLM and validate it against a Pydantic model, with retries.
 
-            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
-                last_error = f"API/Response Error: {str(e)}"
-                logger.warning(f"Error during JSON extraction attempt {attempt+1}: {str(e)}")
-                if attempt == self.retry_attempts - 1:
-                    logger.error(f"Failed to extract JSON after {self.retry_attempts} attempts. Last error: {last_error}")
-                    return None # Indicate definitive failure
-                await asyncio.sleep(2 ** attempt)
-            except Exception as e:
-                last_error = f"Unexpected Error: {str(e)}"
-                logger.error(f"Unexpected error during JSON extraction attempt {attempt+1}: {str(e)}", exc_info=True)
-                if attempt == self.retry_attempts - 1:
-                     logger.error(f"Failed to extract JSON after {self.retry_attempts} attempts due to unexpected error. Last error: {last_error}")
-                     return None # Indicate definitive failure
-                await asyncio.sleep(2 ** attempt)
-
-        # If loop finishes without returning/raising
-        logger.error(f"Failed to extract JSON after {self.retry_attempts} attempts. Last error: {last_error}")
-        return None # Indicate definitive failure
\ No newline at end of file
+        Args:
+            prompt (str): The prompt instructing JSON extraction
+            schema_model: Pydantic model for validation
+
+        Returns:
+            Optional[Union[Dict, List[Dict]]]: The validated JSON data (raw data in lenient mode), or None if extraction fails definitively.
+        """
+        prompt_suffix = self._prompt_suffix(schema_model) # Format/schema instructions, identical across attempts
+        correction: List[str] = []
+
+        try:
+            async for attempt in self._retrying(_RETRYABLE_EXTRACT_ERRORS):
+                with attempt:
+                    attempt_number = attempt.retry_state.attempt_number
+                    json_data = await self._request_json(prompt, prompt_suffix, correction, attempt_number)
+                    try:
+                        return self._validate_json(json_data, schema_model)
+                    except ValidationError as ve:
+                        logger.warning("Schema validation error (attempt %d/%d): %s", attempt_number, self.retry_attempts, ve)
+                        if self.validation_mode != "strict":
+                            logger.warning("Schema validation errors ignored in lenient mode.")
+                            return json_data # Return raw data despite errors
+                        correction[:] = [f"\n\nYour previous response had validation errors against the schema: {str(ve)[:_MAX_CORRECTION_CHARS]}\nPlease fix them and ensure conformance to the required schema."]
+                        raise
+        except _EXTRACT_FAILURES as e:
+            logger.error(f"Failed to extract JSON after {self.retry_attempts} attempts. Last error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to extract JSON due to unexpected error: {str(e)}", exc_info=True)
+        return None # Indicate definitive failure
+
+    def _retrying(self, retry_on) -> AsyncRetrying:
+        """Retry policy for JSON extraction: jittered exponential backoff, retry_attempts attempts, retrying on retry_on."""
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.retry_attempts),
+            wait=wait_exponential_jitter(initial=1, max=10),
+            retry=retry_if_exception_type(retry_on),
+            reraise=True
+        )
+
+    async def _request_json(self, prompt: str, prompt_suffix: str, correction: List[str], attempt_number: int) -> Any:
+        """
+        Run one LLM request and parse the response as JSON.
+
+        On a parse failure the note in correction is replaced so the next attempt tells the model what to fix.
+        Only the latest note is sent, which keeps the prompt size bounded across retries.
+        """
+        logger.info("Attempting LLM JSON extraction (Attempt %d/%d)", attempt_number, self.retry_attempts)
+        json_prompt = prompt + correction[0] + prompt_suffix if correction else prompt + prompt_suffix
+
+        response_str = await self.generate_response(json_prompt, temperature=0.1)
+        logger.debug("LLM JSON attempt %d raw response: %.500s...", attempt_number, response_str)
+
+        try:
+            return _loads(response_str) # Fast path: well-behaved responses are bare JSON
+        except json.JSONDecodeError:
+            pass
+        try:
+            # Strip potential markdown backticks and 'json' language identifier
+            return _loads(_strip_code_fences(response_str))
+        except json.JSONDecodeError as e:
+            logger.warning("Direct JSON parse failed (attempt %d): %s. Raw response: %.200s", attempt_number, e, response_str)
+            correction[:] = [f"\n\nYour previous response was not valid JSON. Please provide only the raw JSON object/array. Error: {str(e)[:_MAX_CORRECTION_CHARS]}"]
+            raise
+
+    def _validate_json(self, json_data: Any, schema_model) -> Union[Dict, List[Dict]]:
+        """Validate parsed JSON against schema_model and return plain dicts (Pydantic v2, with v1 fallback)."""
+        if not isinstance(json_data, (list, dict)):
+            raise ValueError(f"Expected JSON object or list, got {type(json_data).__name__}")
+        try:
+            if isinstance(json_data, list):
+                # Validate and dump the whole list in one pydantic-core pass (Pydantic v2+)
+                adapter = _list_adapter(schema_model)
+                validated_data = adapter.validate_python(json_data)
+                logger.info(f"Successfully extracted and validated list of {len(validated_data)} {schema_model.__name__} items.")
+                return adapter.dump_python(validated_data, exclude_unset=True)
+            validated_data = schema_model.model_validate(json_data)
+            logger.info(f"Successfully extracted and validated {schema_model.__name__}.")
+            return validated_data.model_dump(exclude_unset=True)
+        except AttributeError: # Handle Pydantic v1 fallback if needed
+            logger.warning("Attempting Pydantic v1 validation fallback (parse_obj).")
+            if isinstance(json_data, list):
+                validated_data = [schema_model.parse_obj(item) for item in json_data]
+                logger.info(f"Successfully extracted and validated list of {len(validated_data)} {schema_model.__name__} items (v1).")
+                return [item.dict(exclude_unset=True) for item in validated_data]
+            validated_data = schema_model.parse_obj(json_data)
+            logger.info(f"Successfully extracted and validated {schema_model.__name__} (v1).")
+            return validated_data.dict(exclude_unset=True)
@@ -2,18 +2,59 @@
 
 import os
 import re
+import copy
+import time
+import hashlib
+import sqlite3
 import asyncio
 import aiohttp
 import logging
 import ssl
 import certifi # Import certifi
-from typing import Dict, List, Any, Optional
-from urllib.parse import urlencode
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type, RetryError # Import RetryError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception_type, RetryError # Import RetryError
 import json # Added for JSONDecodeError handling
+import difflib
+
+# rapidfuzz (C++) is much faster than difflib for title similarity; optional
+try:
+    from rapidfuzz import fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Prefer orjson for decoding SerpApi payloads (bytes in, no intermediate str); fall back to the stdlib
+try:
+    import orjson
+    _loads = orjson.loads # Raises orjson.JSONDecodeError, a json.JSONDecodeError subclass
+except ImportError:
+    _loads = json.loads
 
 logger = logging.getLogger('skeo.metadata')
 
+# Patterns used when parsing SerpApi results, compiled once
+_YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+_DOI_RE = re.compile(r'10\.\d{4,9}/[-._;()/:A-Z0-9]+', re.IGNORECASE)
+_JOURNAL_KWS = ("journal", "conf", "proc") # Hints that a summary segment is a venue, not authors
+
+def _title_similarity(a: str, b: str) -> float:
+    """Similarity ratio in [0, 1] between two (already lowercased) titles."""
+    if RAPIDFUZZ_AVAILABLE:
+        return fuzz.ratio(a, b) / 100.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+# certifi SSL context, shared by all fetchers once built (see SerpApiMetadataFetcher._ensure_ssl)
+_DEFAULT_SSL_CONTEXT: Optional[ssl.SSLContext] = None
+
+def _create_ssl_context() -> Optional[ssl.SSLContext]:
+    """Create SSL context using certifi (blocking: reads the CA bundle from disk)."""
+    try:
+        return ssl.create_default_context(cafile=certifi.where())
+    except Exception as e:
+        logger.error("Failed to create SSL context using certifi: %s. SSL verification might still fail.", e, exc_info=True)
+        return None # Fallback to default SSL handling
+
 class SerpApiMetadataFetcher:
     """Fetch paper metadata using the SerpApi Google Scholar endpoint."""
 
@@ -29,44 +70,183 @@ class SerpApiMetadataFetcher:
         metadata_params = params.get('metadata', {}) if params else {}
         self.api_key = metadata_params.get('serpapi_api_key', os.getenv("SERPAPI_API_KEY"))
         self.default_scholar_params = metadata_params.get('serpapi_google_scholar_params', {})
+        self.max_concurrency = max(1, int(metadata_params.get('serpapi_max_concurrency', 8))) # In-flight SerpApi requests
+        self.min_title_similarity = float(metadata_params.get('serpapi_min_title_similarity', 0.6)) # 0 disables the check
+        cache_file = metadata_params.get('cache_file', "~/.cache/skeo/serpapi_cache.sqlite") # Persistent query cache; None/"" disables
+        self.cache_file = os.path.expanduser(cache_file) if cache_file else None
+        self.cache_ttl_seconds = float(metadata_params.get('cache_ttl_days', 30)) * 86400
+        self._db: Optional[sqlite3.Connection] = None # Opened lazily by _get_db, on the cache thread
+        # sqlite connect/queries/commits (which fsync) block, so they all run on this one thread, off the event
+        # loop; a single thread also satisfies sqlite3's same-thread rule for the connection
+        self._db_executor: Optional[ThreadPoolExecutor] = None
 
         self.enabled = bool(self.api_key)
 
+        # Static request params, built once: defaults like hl, num, as_ylo etc. with None values removed and
+        # the rest stringified as urlencode did (aiohttp rejects e.g. bools). Only 'q' varies per search.
+        base_params = {"api_key": self.api_key, "engine": "google_scholar", **self.default_scholar_params}
+        self._base_params = {k: str(v) for k, v in base_params.items() if v is not None and k != "q"}
+        self.ssl_context = None # Default SSL handling unless the certifi context can be created
+        self._ssl_ready = False # Set once _ensure_ssl has run
+        self._ssl_lock: Optional[asyncio.Lock] = None
+        self._session: Optional[aiohttp.ClientSession] = None # Shared session, created lazily on first request
+        self._semaphore: Optional[asyncio.Semaphore] = None # Created lazily so it binds to the running loop
+        # Per-run query cache: (title, first_author) normalized -> parsed metadata, or None for "no results"
+        self._cache: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+
         if not self.enabled:
             logger.warning("SerpApi metadata lookup disabled: SERPAPI_API_KEY not provided in params or environment variables.")
         else:
-            # Create SSL context using certifi
+            # The certifi SSL context is created on first use, off the event loop (see _ensure_ssl)
+            logger.info("SerpApi metadata fetcher initialized.")
+
+
+    async def _ensure_ssl(self):
+        """Load the certifi SSL context in a worker thread so the CA bundle read never blocks the event loop."""
+        global _DEFAULT_SSL_CONTEXT
+        if self._ssl_ready:
+            return
+        if self._ssl_lock is None:
+            self._ssl_lock = asyncio.Lock()
+        async with self._ssl_lock: # Concurrent first requests share one load
+            if self._ssl_ready:
+                return
+            if _DEFAULT_SSL_CONTEXT is None:
+                _DEFAULT_SSL_CONTEXT = await asyncio.to_thread(_create_ssl_context)
+            self.ssl_context = _DEFAULT_SSL_CONTEXT
+            if self.ssl_context is not None:
+                logger.info("SerpApi metadata fetcher using SSL context from certifi.")
+            self._ssl_ready = True
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared SerpApi session, creating it on first use (inside the running event loop)."""
+        if self._session is None or self._session.closed:
+            await self._ensure_ssl()
+        if self._session is None or self._session.closed: # Re-check: another task may have created it meanwhile
+            connector_kwargs = {"limit": self.max_concurrency, "ttl_dns_cache": 300} # Matches the request semaphore
+            if self.ssl_context is not None:
+                connector_kwargs["ssl"] = self.ssl_context # Ensure certifi CA bundle is used
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**connector_kwargs),
+                timeout=aiohttp.ClientTimeout(total=30) # Timeout for SerpApi call
+            )
+        return self._session
+
+    async def aclose(self):
+        """Close the shared HTTP session and the cache database. Safe to call more than once."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._db_executor is not None:
+            await asyncio.get_running_loop().run_in_executor(self._db_executor, self._close_db)
+            self._db_executor.shutdown(wait=False)
+            self._db_executor = None
+
+    def _close_db(self):
+        """Close the cache database (on the cache thread, like every other use of the connection)."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def _run_db(self, func, *args):
+        """Run a blocking cache-database call on the cache thread."""
+        if self._db_executor is None:
+            self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="serpapi-cache")
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, func, *args)
+
+    def _get_db(self) -> Optional[sqlite3.Connection]:
+        """Open (once) the sqlite query cache; returns None if caching is disabled or unavailable."""
+        if self._db is None and self.cache_file:
             try:
-                self.ssl_context = ssl.create_default_context(cafile=certifi.where())
-                logger.info("SerpApi metadata fetcher initialized with SSL context using certifi.")
-            except Exception as e:
-                 logger.error(f"Failed to create SSL context using certifi: {e}. SSL verification might still fail.", exc_info=True)
-                 self.ssl_context = None # Fallback to default SSL handling
+                cache_dir = os.path.dirname(self.cache_file)
+                if cache_dir:
+                    os.makedirs(cache_dir, exist_ok=True)
+                self._db = sqlite3.connect(self.cache_file)
+                self._db.execute("PRAGMA journal_mode=WAL") # Readers don't block the writer across concurrent runs
+                self._db.execute("CREATE TABLE IF NOT EXISTS serpapi_cache (query_hash TEXT PRIMARY KEY, result TEXT, fetched_at REAL NOT NULL)")
+                self._db.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("SerpApi cache file %s unavailable (%s). Continuing without persistent cache.", self.cache_file, e)
+                self._db = None
+                self.cache_file = None # Don't retry on every lookup
+        return self._db
+
+    @staticmethod
+    def _query_hash(cache_key: Tuple[str, str]) -> str:
+        return hashlib.sha1("\x1f".join(cache_key).encode('utf-8')).hexdigest()
+
+    def _disk_cache_get(self, cache_key: Tuple[str, str]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a query in the persistent cache. Returns (found, metadata-or-None); expired rows count as missing.
 
+        Blocking; runs on the cache thread (see _run_db).
+        """
+        db = self._get_db()
+        if db is None:
+            return False, None
+        try:
+            row = db.execute(
+                "SELECT result FROM serpapi_cache WHERE query_hash = ? AND fetched_at > ?",
+                (self._query_hash(cache_key), time.time() - self.cache_ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return False, None
+            return True, (_loads(row[0]) if row[0] is not None else None)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("SerpApi cache read failed: %s", e)
+            return False, None
+
+    async def _remember(self, cache_key: Tuple[str, str], metadata: Optional[Dict[str, Any]]):
+        """Store a lookup result (None = no match) in the in-memory and persistent caches."""
+        self._cache[cache_key] = copy.deepcopy(metadata)
+        if self.cache_file:
+            await self._run_db(self._disk_cache_put, cache_key, metadata)
+
+    def _disk_cache_put(self, cache_key: Tuple[str, str], metadata: Optional[Dict[str, Any]]):
+        """Write a lookup result to the persistent cache. Blocking; runs on the cache thread (see _run_db)."""
+        db = self._get_db()
+        if db is None:
+            return
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO serpapi_cache (query_hash, result, fetched_at) VALUES (?, ?, ?)",
+                (self._query_hash(cache_key), json.dumps(metadata) if metadata is not None else None, time.time())
+            )
+            db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("SerpApi cache write failed: %s", e)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
 
     # Keep tenacity retry for transient network issues, but add specific error handling below
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2), retry=retry_if_exception_type(aiohttp.ClientError))
-    async def _make_serpapi_request(self, url: str, timeout: aiohttp.ClientTimeout) -> Optional[Dict]:
-        """Internal method to make the cancellable request with SSL context."""
-        # Pass the SSL context directly to the ClientSession
-        # aiohttp will handle connector creation/reuse more efficiently
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            logger.debug(f"Making GET request to: {url}")
-            # Pass ssl context here if needed explicitly, or often it's picked up
-            # For clarity and ensuring certifi is used:
-            async with session.get(url, ssl=self.ssl_context) as response:
+    # Jittered exponential backoff keeps concurrent tasks from retrying in lockstep
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential_jitter(initial=1.0, max=30.0, jitter=0.5), retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)))
+    async def _make_serpapi_request(self, api_params: Dict[str, str]) -> Optional[Dict]:
+        """Internal method to make the cancellable request over the shared session."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        session = await self._get_session()
+        async with self._semaphore: # Bound fan-out to stay within SerpApi rate limits
+            if logger.isEnabledFor(logging.DEBUG): # Guard: building the masked copy isn't free
+                logger.debug("Making GET request to: %s with params %s", self.BASE_URL, dict(api_params, api_key='***')) # Never log the key
+            async with session.get(self.BASE_URL, params=api_params) as response:
                 if response.status != 200:
                     error_text = await response.text()
-                    logger.warning(f"SerpApi request failed (HTTP {response.status}): {error_text[:500]}")
-                    response.raise_for_status()
-                    return None # Should not be reached
+                    logger.warning("SerpApi request failed (HTTP %d): %.500s", response.status, error_text)
+                    if response.status >= 500 or response.status == 429:
+                        response.raise_for_status() # Transient: let tenacity retry
+                    return None # Other 4xx (bad key, quota, bad request) won't succeed on retry
 
                 # Successfully received response
                 try:
-                    data = await response.json()
+                    data = _loads(await response.read())
                     return data
                 except json.JSONDecodeError as json_err:
-                    logger.error(f"Failed to decode JSON response from SerpApi: {json_err}")
+                    logger.error("Failed to decode JSON response from SerpApi: %s", json_err)
                     return None
 
     async def search_scholar_metadata(self, title: str, first_author: Optional[str] = None) -> Optional[Dict[str, Any]]:
@@ -88,49 +268,48 @@ class SerpApiMetadataFetcher:
              logger.warning("Skipping metadata search: Invalid or empty title provided.")
              return None
 
+        cache_key = self._query_key(title, first_author)
+        if cache_key not in self._cache and self.cache_file:
+            found, stored = await self._run_db(self._disk_cache_get, cache_key)
+            if found:
+                self._cache[cache_key] = stored
+        if cache_key in self._cache:
+            logger.debug("SerpApi query cache hit for: '%s'", title)
+            cached = self._cache[cache_key]
+            return copy.deepcopy(cached) if cached is not None else None # Callers may modify the returned dict
+
         search_query = f'"{title.strip()}"' # Exact title match, stripped
         if first_author and isinstance(first_author, str) and len(first_author.strip()) > 0:
             search_query += f' author:"{first_author.strip()}"'
 
-        api_params = {
-            "api_key": self.api_key,
-            "engine": "google_scholar",
-            "q": search_query,
-            **self.default_scholar_params # Include defaults like hl, num, as_ylo etc.
-        }
+        api_params = self._base_params | {"q": search_query}
 
-        # Remove None values from params
-        api_params = {k: v for k, v in api_params.items() if v is not None}
-
-        url = f"{self.BASE_URL}?{urlencode(api_params)}"
-        request_timeout = aiohttp.ClientTimeout(total=30) # Timeout for SerpApi call
-
-        logger.info(f"Querying SerpApi Google Scholar for: {search_query}")
+        logger.info("Querying SerpApi Google Scholar for: %s", search_query)
 
         data = None
         try:
             # Call the internal request method which uses tenacity for retries
-            data = await self._make_serpapi_request(url, request_timeout)
+            data = await self._make_serpapi_request(api_params)
 
         # --- Graceful Error Handling ---
         except RetryError as e:
             # This catches errors if tenacity retries failed (e.g., persistent connection issues)
-            logger.warning(f"SerpApi request failed after multiple retries: {e}. Proceeding without online metadata.")
+            logger.warning("SerpApi request failed after multiple retries: %s. Proceeding without online metadata.", e)
             return None
         except aiohttp.ClientConnectorCertificateError as ssl_err:
             # Specific handling for the SSL certificate verification error
-            logger.error(f"SerpApi SSL Certificate Verification Failed: {ssl_err}. Check your system's CA certificates or install/update 'certifi'. Proceeding without online metadata.")
+            logger.error("SerpApi SSL Certificate Verification Failed: %s. Check your system's CA certificates or install/update 'certifi'. Proceeding without online metadata.", ssl_err)
             return None
         except aiohttp.ClientConnectionError as conn_err:
             # Handle other connection errors (e.g., DNS resolution failed, connection refused)
-            logger.warning(f"SerpApi Connection Error: {conn_err}. Proceeding without online metadata.")
+            logger.warning("SerpApi Connection Error: %s. Proceeding without online metadata.", conn_err)
             return None
         except asyncio.TimeoutError:
             logger.warning("SerpApi request timed out. Proceeding without online metadata.")
             return None
         except Exception as e:
             # Catch any other unexpected errors during the request
-            logger.error(f"Unexpected error during SerpApi request: {str(e)}", exc_info=True)
+            logger.error("Unexpected error during SerpApi request: %s", e, exc_info=True)
             return None
         # --- End Graceful Error Handling ---
 
@@ -142,21 +321,76 @@ class SerpApiMetadataFetcher:
 
         # Check for errors reported by SerpApi itself in the JSON response
         if "error" in data:
-             logger.warning(f"SerpApi returned an error message: {data['error']}. Proceeding without online metadata.")
+             logger.warning("SerpApi returned an error message: %s. Proceeding without online metadata.", data['error'])
              return None
 
         # Process organic results
         if "organic_results" not in data or not data["organic_results"]:
-            logger.info(f"No Google Scholar organic results found via SerpApi for: '{title}'")
+            logger.info("No Google Scholar organic results found via SerpApi for: '%s'", title)
+            await self._remember(cache_key, None) # Genuine negative result; errors above are never cached
             return None
 
         # Process the first result (best guess)
         result = data["organic_results"][0]
-        logger.info(f"Found potential metadata via SerpApi for: '{title}'")
-        return self._parse_serpapi_result(result)
+        if self.min_title_similarity > 0:
+            similarity = _title_similarity(cache_key[0], (result.get("title") or "").strip().lower())
+            if similarity < self.min_title_similarity:
+                logger.info("Top SerpApi result '%s' does not match '%s' (similarity %.2f). Ignoring.", result.get('title', ''), title, similarity)
+                await self._remember(cache_key, None) # Same query would return the same mismatch
+                return None
+        logger.info("Found potential metadata via SerpApi for: '%s'", title)
+        metadata = self._parse_serpapi_result(result)
+        await self._remember(cache_key, metadata)
+        return metadata
         # --- End Process Successful Response ---
 
 
+    async def search_scholar_metadata_batch(self, queries: List[Tuple[str, Optional[str]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up metadata for many (title, first_author) pairs concurrently.
+
+        Duplicate queries (after normalization) are only sent once; concurrency is bounded
+        by the fetcher's semaphore.
+
+        Args:
+            queries: List of (title, first_author) tuples.
+
+        Returns:
+            List of metadata dicts (or None) in the same order as queries.
+        """
+        if not self.enabled or not queries:
+            return [None] * len(queries)
+
+        # De-duplicate on the normalized key, keeping the first spelling of each query (dict preserves order)
+        unique: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        for t, a in queries:
+            if isinstance(t, str): # Invalid titles are answered with None below
+                unique.setdefault(self._query_key(t, a), (t, a))
+
+        keys = list(unique)
+        results = await asyncio.gather(*[self.search_scholar_metadata(*unique[k]) for k in keys], return_exceptions=True)
+        by_key = {}
+        for k, r in zip(keys, results):
+            if isinstance(r, Exception):
+                logger.warning("SerpApi batch lookup failed for '%s': %s", unique[k][0], r)
+                r = None
+            by_key[k] = r
+
+        out = []
+        seen = set()
+        for t, a in queries:
+            k = self._query_key(t, a) if isinstance(t, str) else None
+            r = by_key.get(k)
+            # Each caller gets its own dict when the same query appears more than once
+            out.append(copy.deepcopy(r) if r is not None and k in seen else r)
+            seen.add(k)
+        return out
+
+    @staticmethod
+    def _query_key(title: str, first_author: Optional[str]) -> Tuple[str, str]:
+        """Normalized (title, first_author) key used for the query cache and batch de-duplication."""
+        return (title.strip().lower(), first_author.strip().lower() if isinstance(first_author, str) else "")
+
     def _parse_serpapi_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parses a single organic result from SerpApi Google Scholar response
@@ -188,54 +422,52 @@ class SerpApiMetadataFetcher:
         # Parse authors from publication_info summary string (heuristic)
         pub_summary = metadata["publication_info"].get("summary", "")
         if pub_summary:
-            parts = pub_summary.split(" - ")
-            if len(parts) > 0:
-                 potential_authors_str = parts[0]
-                 # Basic check to avoid misinterpreting journal as authors
-                 if "," in potential_authors_str and not any(kw in potential_authors_str.lower() for kw in ["journal", "conf", "proc"]):
-                      authors = [a.strip() for a in potential_authors_str.split(",")]
-                      metadata["authors"] = [{"name": name} for name in authors if name]
-
-            # Try to extract Journal, Year from parts
-            year_match = re.search(r'\b(19|20)\d{2}\b', pub_summary)
+            parts = pub_summary.split(" - ", 2) # Only the first two segments are used
+            authors_part = parts[0]
+            # Basic check to avoid misinterpreting journal as authors
+            if "," in authors_part:
+                lowered = authors_part.lower()
+                if not any(kw in lowered for kw in _JOURNAL_KWS):
+                    metadata["authors"] = [{"name": name} for name in (a.strip() for a in authors_part.split(",")) if name]
+
+            # Try to extract Year from the summary (single search, match reused)
+            year_match = _YEAR_RE.search(pub_summary)
             if year_match:
-                metadata["year"] = year_match.group(0)
-                metadata["publicationDate"] = metadata["year"]
+                metadata["year"] = metadata["publicationDate"] = year_match.group(0)
 
             # Simple journal extraction (may need refinement)
-            potential_journal_str = None
             if len(parts) > 1:
-                potential_journal_str = parts[1] # Often the second part
-            elif len(parts) == 1 and not metadata["authors"]: # If only one part and it wasn't authors
-                 potential_journal_str = parts[0]
-
-            if potential_journal_str and not re.fullmatch(r'\b(19|20)\d{2}\b', potential_journal_str.strip()):
-                metadata["journal"] = potential_journal_str.strip()
-
+                journal_part = parts[1].strip() # Often the second part
+            elif not metadata["authors"]: # If only one part and it wasn't authors
+                journal_part = authors_part.strip()
+            else:
+                journal_part = ""
+            if journal_part and not _YEAR_RE.fullmatch(journal_part):
+                metadata["journal"] = journal_part
 
-        # Extract DOI if available in inline links
-        inline_links = result.get("inline_links", {})
-        # DOI isn't typically here, but checking just in case structure changes
-        # if "doi_link" in inline_links and "link" in inline_links["doi_link"]:
-        #      doi_match = re.search(r'(10\.\d{4,9}/[-._;()/:A-Z0-9]+)', inline_links["doi_link"]["link"], re.IGNORECASE)
-        #      if doi_match: metadata["doi"] = doi_match.group(1)
 
         # Look for direct PDF links if provided (e.g., resources)
-        resources = result.get("resources", [])
+        resources = result.get("resources") or []
         for resource in resources:
             if resource.get("file_format", "").lower() == "pdf":
                 metadata["pdfPath"] = resource.get("link") # Assign first PDF link found
                 break # Take the first PDF link
 
-        # Try to extract DOI from standard link (less reliable fallback)
-        if metadata["fileUrl"] and not metadata["doi"]:
-            doi_match = re.search(r'(10\.\d{4,9}/[-._;()/:A-Z0-9]+)', metadata["fileUrl"], re.IGNORECASE)
-            if doi_match:
-                metadata["doi"] = doi_match.group(1).strip().rstrip('.')
+        # Extract DOI with one scan over all candidate fields, most reliable first
+        # (DOIs contain no spaces, so a match can't span two joined fields)
+        doi_link = (result.get("inline_links") or {}).get("doi_link") or {}
+        haystack = " ".join(x for x in (
+            doi_link.get("link"), result.get("link"), result.get("snippet"),
+            *(r.get("link") for r in resources)
+        ) if isinstance(x, str) and x)
+        doi_match = _DOI_RE.search(haystack) if haystack else None
+        if doi_match:
+            metadata["doi"] = doi_match.group(0).rstrip('.),;')
 
 
         # Clean up empty strings and remove raw publication_info
-        metadata = {k: v for k, v in metadata.items() if v or isinstance(v, (int, bool))}
         metadata.pop("publication_info", None)
+        for k in [k for k, v in metadata.items() if not v and not isinstance(v, (int, bool))]:
+            del metadata[k] # In place, no second dict per parsed record
 
         return metadata
\ No newline at end of file
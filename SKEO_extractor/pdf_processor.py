@@ -2,10 +2,21 @@
 
 import os
 import re
+import json
+import time
+import shutil
+import string
+import unicodedata
 import logging
 import asyncio
+import hashlib
+import functools
+import multiprocessing
+from collections import OrderedDict
+from pathlib import PurePath
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pymupdf as fitz  # PyMuPDF
-from typing import Dict, List, Any, Optional, Tuple # Added Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable, Awaitable # Added Tuple
 import sys
 
 # Use conditional import for Docling to avoid hard dependency if not used
@@ -22,15 +33,39 @@ except ImportError:
     TableFormerMode = None
     DOCLING_AVAILABLE = False
 
+# Docling's threaded pipeline (page-batched, overlapping stages) ships with Docling 2.43.0+ (the pinned minimum); imported
+# optionally so use_threaded_pipeline can fall back to the standard pipeline
+try:
+    from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline
+    from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions
+    from docling.datamodel.settings import settings as docling_settings
+    DOCLING_THREADED_AVAILABLE = True
+except ImportError:
+    ThreadedStandardPdfPipeline = None
+    ThreadedPdfPipelineOptions = None
+    docling_settings = None
+    DOCLING_THREADED_AVAILABLE = False
+
 # Use conditional import for language detection
 try:
     from langdetect import detect, LangDetectException
+    from langdetect import detector_factory
     LANGDETECT_AVAILABLE = True
 except ImportError:
     detect = None
-    LangDetectException = None
+    detector_factory = None
+    class LangDetectException(Exception): # Placeholder so the except clause stays valid when fastText is used alone
+        pass
     LANGDETECT_AVAILABLE = False
 
+# fastText language ID (lid.176) is preferred when installed and a model path is configured
+try:
+    import fasttext
+    FASTTEXT_AVAILABLE = True
+except ImportError:
+    fasttext = None
+    FASTTEXT_AVAILABLE = False
+
 # Import necessary components (adjust path based on your structure)
 try:
     from llm_client import LLMClient
@@ -41,6 +76,487 @@ except ImportError as e:
 
 logger = logging.getLogger('skeo.pdf')
 
+# table_structure_mode config values -> Docling TableFormer modes (anything else means ACCURATE)
+_TABLEFORMER_MODES = {"FAST": TableFormerMode.FAST, "ACCURATE": TableFormerMode.ACCURATE} if DOCLING_AVAILABLE else {}
+
+# langdetect profiles loaded by default; loading all ~55 keeps large n-gram maps resident for the process lifetime
+_DEFAULT_LANGDETECT_LANGUAGES = ('en', 'es', 'ar', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-cn', 'zh-tw', 'hi', 'bn', 'id')
+
+def _init_langdetect(languages: Optional[List[str]]) -> None:
+    """
+    Initialize langdetect's shared factory with a subset of language profiles and a fixed seed.
+
+    Must run before the first detect() call, which would otherwise load every bundled profile.
+    A falsy languages value keeps langdetect's default (all profiles). No-op once initialized.
+    """
+    if not LANGDETECT_AVAILABLE or detector_factory._factory is not None:
+        return
+    detector_factory.DetectorFactory.seed = 0 # langdetect is non-deterministic without a seed
+    if not languages:
+        return
+    profile_dir = detector_factory.PROFILES_DIRECTORY
+    available = set(os.listdir(profile_dir))
+    json_profiles = []
+    for lang in dict.fromkeys(languages):
+        if lang in available:
+            with open(os.path.join(profile_dir, lang), 'r', encoding='utf-8') as f:
+                json_profiles.append(f.read())
+        else:
+            logger.warning(f"No langdetect profile for language '{lang}'; skipping.")
+    if len(json_profiles) < 2: # langdetect needs at least two profiles
+        logger.warning("Too few langdetect profiles selected; loading all profiles instead.")
+        return
+    factory = detector_factory.DetectorFactory()
+    factory.load_json_profile(json_profiles)
+    detector_factory._factory = factory
+    logger.debug(f"Loaded {len(json_profiles)} langdetect profiles")
+
+_LANGUAGE_CACHE_SIZE = 4096 # Max cached language-detection results per PDFProcessor
+_LANGUAGE_SNIPPET_CHARS = 2000 # Characters of text fed to the language detector
+_MIN_LANGUAGE_TEXT_CHARS = 40 # Shorter texts are skipped; detectors are unreliable on them
+_MISSING_LANGUAGE = object() # Cache-miss sentinel (None is a valid cached result)
+
+# Documents with at least this many pages have PyMuPDF text extraction split across worker processes
+_PARALLEL_PAGE_THRESHOLD = 32
+_PAGE_POOL: Optional[ProcessPoolExecutor] = None
+
+_TORCH_THREADS_SET = False
+
+def _set_torch_threads(num_threads: int) -> None:
+    """Cap torch intra-op threads once per process (no-op when torch is not installed)."""
+    global _TORCH_THREADS_SET
+    if _TORCH_THREADS_SET:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(num_threads)
+    _TORCH_THREADS_SET = True
+    logger.debug(f"Set torch intra-op threads to {num_threads}")
+
+# Title matching ignores case, whitespace, hyphenation and '_'/'.' and compares NFKC forms (ligatures
+# expanded), so one extraction of the first page covers what used to need several text-flag variants
+_TITLE_MATCH_STRIP = str.maketrans('', '', string.whitespace + '\u00a0\u00ad\u2010\u2011-_.')
+
+def _normalize_for_title_match(text: str) -> str:
+    """Canonical form used on both sides of a title-in-text check."""
+    return unicodedata.normalize('NFKC', text).casefold().translate(_TITLE_MATCH_STRIP)
+
+# Each title candidate (Docling heading, PDF metadata, filename) is checked against the same first-page
+# markdown, so it is normalized once per document instead of once per candidate
+_normalize_page_for_title_match = functools.lru_cache(maxsize=32)(_normalize_for_title_match)
+
+def _prefetch_file(path: str) -> None:
+    """
+    Ask the kernel to start reading a file into the page cache in the background (POSIX_FADV_WILLNEED).
+
+    The advice itself returns immediately; a later fitz.open then finds the data in memory. Opening the file may
+    still block, so callers on the event loop run this in an executor. No-op where posix_fadvise is unavailable.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return # Missing/unreadable files are reported when they are processed
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+_FILENAME_NUMBERING_RE = re.compile(r'^\d+[-_]?\s*') # Leading numbering in file names, e.g. "01-" or "3 "
+
+def _title_from_filename(pdf_path: str) -> str:
+    """Guess a title from a PDF's file name: stem with underscores as spaces and leading numbering removed."""
+    filename_title = PurePath(pdf_path).stem.replace('_', ' ')
+    # Basic cleaning for filename titles
+    filename_title = _FILENAME_NUMBERING_RE.sub('', filename_title, count=1) # Remove leading numbers/hyphens/underscores
+    return filename_title.strip()
+
+# Keywords may be separated by ';' or ','; translate to one separator so a plain str.split suffices
+_KW_TRANS = str.maketrans({';': ','})
+
+def _split_names(value: str, table: Optional[dict] = None) -> List[str]:
+    """Split a comma-separated PDF metadata string (optionally translated first) into stripped, non-empty items."""
+    if table is not None:
+        value = value.translate(table)
+    return [item for item in (part.strip() for part in value.split(',')) if item]
+
+_EMPTY_MD: Dict[str, Any] = {} # Stand-in for a missing online metadata result; never mutated
+
+def _merge_metadata(basic_metadata: Dict[str, str], online_metadata: Optional[Dict[str, Any]],
+                    pdf_authors: List[str]) -> Dict[str, Any]:
+    """
+    Combine online (SerpApi) metadata with metadata embedded in the PDF.
+
+    Online values take priority; title and DOI fall back to the PDF's values, authors and keywords
+    to the PDF's author/keyword lists, and publicationDate to the online year.
+    """
+    om = online_metadata or _EMPTY_MD
+    merged = {
+        "title": om.get("title") or basic_metadata["title"],
+        "authors": om.get("authors") or [{"name": name} for name in pdf_authors],
+        "doi": om.get("doi") or basic_metadata["doi"],
+        "journal": om.get("journal", ""),
+        "publicationDate": om.get("publicationDate") or om.get("year"),
+        "year": om.get("year", ""),
+        "volume": om.get("volume", ""),
+        "issue": om.get("issue", ""),
+        "pages": om.get("pages", ""),
+        "keywords": om.get("keywords") or [],
+        "abstract": om.get("abstract", ""),
+        "fileUrl": om.get("fileUrl", ""),
+        "pdfPath": om.get("pdfPath"), # Path from online source, if any
+    }
+    if not merged["keywords"] and basic_metadata["keywords_str"]:
+        merged["keywords"] = _split_names(basic_metadata["keywords_str"], _KW_TRANS)
+    return merged
+
+# Conservative (low) chars-per-page estimate used to skip Docling pages that max_text_length would cut anyway
+_MIN_CHARS_PER_PAGE = 1000
+
+# Plain-text extraction flags: expand ligatures and skip image blocks, both of which are discarded anyway,
+# and let MuPDF rejoin words hyphenated across line breaks so no post-processing pass is needed
+_TEXT_FLAGS = (fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES & ~fitz.TEXT_PRESERVE_IMAGES) | fitz.TEXT_DEHYPHENATE
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    """Create the shared page-extraction process pool on first use."""
+    global _PAGE_POOL
+    if _PAGE_POOL is None:
+        # spawn: forked children must not inherit the parent's event loop or open MuPDF handles
+        _PAGE_POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+    return _PAGE_POOL
+
+def _shutdown_page_pool() -> None:
+    """Stop the page-extraction worker processes, if started; the next _get_page_pool creates a new pool."""
+    global _PAGE_POOL
+    if _PAGE_POOL is not None:
+        _PAGE_POOL.shutdown(wait=False, cancel_futures=True)
+        _PAGE_POOL = None
+
+def _extract_pages(pdf_path: str, start: int, end: int, max_chars: Optional[int] = None) -> str:
+    """
+    Extract plain text for pages [start, end) of a PDF. Runs in a worker process, so it opens its own document.
+
+    Stops early once max_chars characters have been collected; nothing past that can survive truncation.
+    """
+    parts = []
+    total_len = 0
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(start, end):
+            try:
+                page_text = doc[page_num].get_text("text", flags=_TEXT_FLAGS)
+            except Exception as page_err:
+                logger.warning(f"Error extracting text from page {page_num+1} of {pdf_path}: {page_err}")
+                page_text = f"[Content Extraction Error on Page {page_num+1}]"
+            parts.append(page_text)
+            total_len += len(page_text) + 1
+            if max_chars is not None and total_len >= max_chars:
+                break
+    return "\n".join(parts) + "\n" if parts else "" # Every page's text ends with a newline
+
+def _build_docling_converter(pipeline_kwargs: Dict[str, Any], table_mode: Optional[str] = None,
+                             table_cell_matching: Optional[bool] = None, threaded: bool = False) -> Any:
+    """
+    Build a DocumentConverter for PDFs from plain, picklable option values.
+
+    Args:
+        pipeline_kwargs: Keyword arguments for PdfPipelineOptions.
+        table_mode: TableFormer mode name ('ACCURATE' or 'FAST'), or None to keep Docling's default.
+        table_cell_matching: TableFormer cell matching flag, or None to keep Docling's default.
+        threaded: Use Docling's threaded (page-batched) PDF pipeline.
+    """
+    if threaded:
+        pipeline_opts = ThreadedPdfPipelineOptions(**pipeline_kwargs)
+        format_option = PdfFormatOption(pipeline_cls=ThreadedStandardPdfPipeline, pipeline_options=pipeline_opts)
+    else:
+        pipeline_opts = PdfPipelineOptions(**pipeline_kwargs)
+        format_option = PdfFormatOption(pipeline_options=pipeline_opts)
+    if table_mode is not None:
+        pipeline_opts.table_structure_options.mode = _TABLEFORMER_MODES.get(table_mode, TableFormerMode.ACCURATE)
+    if table_cell_matching is not None:
+        pipeline_opts.table_structure_options.do_cell_matching = table_cell_matching
+    return DocumentConverter(format_options={InputFormat.PDF: format_option})
+
+def _convert_and_export(converter: Any, pdf_path: str, convert_kwargs: Dict[str, Any],
+                        first_page: bool = False) -> Optional[Tuple[str, str, str]]:
+    """
+    Convert a PDF and export it, returning (markdown, plain_text, first_page_markdown) or None if Docling produced no document.
+
+    plain_text is only exported (as a fallback) when the markdown is empty; otherwise it is "".
+    first_page_markdown is only exported when first_page is set; otherwise it is "". Exporting a single page
+    (export_to_markdown(page_no=...)) and convert(page_range=...) need the Docling release pinned in
+    skeo-requirements.txt.
+    """
+    result = converter.convert(pdf_path, **convert_kwargs)
+    if not result or not result.document:
+        return None
+    markdown_text = result.document.export_to_markdown()
+    return (markdown_text, ("" if markdown_text else result.document.export_to_text()),
+            result.document.export_to_markdown(page_no=1) if first_page else "")
+
+# Converters built inside Docling worker processes, keyed like PDFProcessor's own converter cache
+_WORKER_CONVERTERS: Dict[tuple, Any] = {}
+
+def _docling_convert_worker(pdf_path: str, converter_args: tuple, convert_kwargs: Dict[str, Any],
+                            first_page: bool = False) -> Optional[Tuple[str, str, str]]:
+    """Process-pool entry point: convert with a per-process cached converter and return only the exported text."""
+    pipeline_kwargs, table_mode, table_cell_matching, threaded = converter_args
+    key = (frozenset(pipeline_kwargs.items()), table_mode, table_cell_matching, threaded)
+    converter = _WORKER_CONVERTERS.get(key)
+    if converter is None:
+        converter = _WORKER_CONVERTERS[key] = _build_docling_converter(*converter_args)
+    return _convert_and_export(converter, pdf_path, convert_kwargs, first_page)
+
+def _page_count(pdf_path: str) -> int:
+    """Number of pages in a PDF."""
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+def _read_pdf_basics(pdf_path: str) -> Tuple[Dict[str, Any], int, Optional[str]]:
+    """Embedded metadata, page count and first-page text (see PDFProcessor._read_first_page_text), from one open."""
+    with fitz.open(pdf_path) as doc:
+        return doc.metadata or {}, doc.page_count, PDFProcessor._read_first_page_text(doc)
+
+def _read_first_page_texts_from_file(pdf_path: str) -> List[str]:
+    """Open a PDF and return its first page's text normalized for title matching (see PDFProcessor._read_first_page_texts)."""
+    with fitz.open(pdf_path) as doc:
+        return PDFProcessor._read_first_page_texts(doc)
+
+# Regex patterns used for metadata refinement and section parsing, compiled once at import
+# Markdown heading line (leading blanks allowed): level marker, rest of the line. Matched with finditer over
+# the whole text, so the regex engine skips body lines instead of a Python loop over every line
+_HEADER_RE = re.compile(r'^[^\S\n]*(#+)[^\S\n]*([^\n]*)', re.MULTILINE)
+_TITLE_SCAN_LINES = 200 # First-page markdown lines searched for a title heading
+_DOI_RE = re.compile(r'\b(10\.\d{4,9}/[-._;()/:A-Z0-9]+)\b', re.IGNORECASE)
+# A year after a publication keyword (group 1) or a standalone year (group 2), found in one scan.
+# A standalone match never covers the start of a keyword match, so the first group-1 match is the
+# same one a separate keyword-only search would find
+_YEAR_RE = re.compile(r'(?:published|received|accepted|©|copyright|\()\s*((?:19|20)\d{2})\b|\b((?:19|20)\d{2})\b', re.IGNORECASE)
+_STANDALONE_YEAR_CHARS = 1000 # Standalone years are only trusted this close to the top
+_PUB_RE = re.compile(
+    r'([A-Za-z\s&]{5,})' r'(?:[,\.]|\s+)' r'(?:Vol\.?|Volume)?\s*(\d+)'
+    r'(?:(?:,\s*|\s+)\(?No\.?|Issue\)?\s*(\d+|\w+))?' r'(?:(?:,\s*|\s+)\(?(?:(?:pp|pages)\.?\s*)?([\d\-–]+)\)?)?'
+    r'(?:(?:,\s*|\s+)\(?((?:19|20)\d{2})\)?)?', re.IGNORECASE | re.MULTILINE)
+# Maximal runs of the journal-name character class. _PUB_RE can only match at the start of such a run
+# (if it fails there, it fails at every later offset in the run too), so trying run starts gives the same
+# leftmost match as _PUB_RE.search without its quadratic backtracking over long runs of prose
+_PUB_RUN_RE = re.compile(r'[A-Za-z\s&]{5,}')
+
+def _search_head_first(pattern: re.Pattern, text: str, head_len: int) -> Optional[re.Match]:
+    """
+    Same result as pattern.search(text) for a pattern that never matches or looks across whitespace (such as
+    _DOI_RE), scanning only the first head_len characters when that suffices.
+
+    The head is cut at its last space or newline, not at head_len: a match running into a bare cut-off could
+    backtrack to an earlier word boundary and end before it, shortened. The full text is searched only when
+    the head has no match.
+    """
+    if len(text) <= head_len:
+        return pattern.search(text)
+    cut = max(text.rfind(' ', 0, head_len), text.rfind('\n', 0, head_len))
+    head_match = pattern.search(text, 0, cut) if cut > 0 else None
+    return head_match or pattern.search(text)
+
+def _find_year(text: str) -> Tuple[Optional[str], bool]:
+    """
+    Year for the document from one _YEAR_RE scan: the first year after a publication keyword anywhere in
+    text, else the first standalone year within _STANDALONE_YEAR_CHARS. Returns (year, found_in_context).
+    """
+    standalone_year = None
+    for year_match in _YEAR_RE.finditer(text):
+        if year_match.group(1):
+            return year_match.group(1), True
+        if standalone_year is None and year_match.end() <= _STANDALONE_YEAR_CHARS:
+            standalone_year = year_match.group(2)
+    return standalone_year, False
+
+def _search_pub_info(text: str, head_len: Optional[int] = None) -> Optional[re.Match]:
+    """
+    Equivalent to _PUB_RE.search(text), but linear in the length of the text.
+
+    With head_len, the first head_len characters are searched first, as in _search_head_first; publication
+    info usually sits at the top, so the rest of the text is only scanned when the head has no usable match.
+    """
+    if head_len is not None and len(text) > head_len:
+        head_match = _search_pub_info(text[:head_len]) # Matches inside the head are also matches in text
+        if head_match and head_match.end() < head_len:
+            return _PUB_RE.match(text, head_match.start())
+    for run in _PUB_RUN_RE.finditer(text):
+        pub_match = _PUB_RE.match(text, run.start())
+        if pub_match:
+            return pub_match
+    return None
+
+# Section keys every extraction result carries (empty string when not found), in output order
+_REQUIRED_SECTIONS = ("abstract", "introduction", "methodology", "results", "discussion", "conclusion", "references")
+_CORE_SECTIONS = ("introduction", "methodology", "results", "discussion") # Any missing: try to infer sections
+_LLM_TARGET_SECTIONS = ("abstract", "introduction", "methodology", "results", "discussion", "conclusion") # Inferable by the LLM
+_FRONT_SECTIONS = ("abstract", "introduction") # Found near the start of a paper
+# Skip LLM section inference when this many target sections were parsed with at least _STRONG_SECTION_CHARS each;
+# the remaining ones are most likely absent from the paper (e.g. no separate discussion) rather than missed
+_STRONG_SECTIONS_SKIP_LLM = 4
+_STRONG_SECTION_CHARS = 500
+
+# Markdown section headers in priority order (first match wins), fused below into one alternation
+# whose named groups identify the section, so a single match() classifies a header line
+_SECTION_PATTERNS = (
+    ("abstract", r'^#+\s*(?:abstract|summary)\s*$'),
+    ("introduction", r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:introduction|background)\s*$'),
+    ("related_work", r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:related\s+work|literature\s+review)\s*$'),
+    ("methodology", r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:method(?:s|ology)?|materials\s+(?:and\s+)?methods|experimental(?:\s+design|\s+setup)?|proposed\s+method|approach|study\s+design)\s*$'),
+    ("results", r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:results|findings|evaluation|experiments(?:\s+and\s+results)?)\s*$'),
+    ("discussion", r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:discussion)\s*$'),
+    ("conclusion", r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:conclusion(?:s)?|summary(?: and Future Work)?)\s*$'),
+    ("references", r'^#+\s*(?:references|bibliography|literature\s+cited)\s*$'),
+    ("acknowledgements", r'^#+\s*(?:acknowledgements?|acknowledgments?)\s*$'),
+    ("appendix", r'^#+\s*(?:appendix|appendices|supplementary\s+(?:material|information))\s*$'),
+)
+# Sections parsed from markdown that are folded into a standard section
+_SECTION_KEY_MAP = {"related_work": "methodology", "acknowledgements": "conclusion", "appendix": "references"}
+
+def _header_body_pattern(pattern: str) -> str:
+    """
+    Turn a markdown header pattern into the part after its '#' marker, for the fused header regexes below.
+
+    Whitespace is restricted to spaces/tabs so a match never spans lines: in plain text, a bare page-number
+    line followed by "Introduction" must not match as the header "<number> Introduction" starting a line early.
+    """
+    return pattern.removeprefix(r'^#+\s*').replace(r'\s', r'[^\S\n]')
+
+# All section headers of a markdown document, found with one finditer over the whole text. The line start,
+# indentation and '#' marker shared by every header pattern are matched once, so the engine only tries the
+# section alternatives on '#' lines instead of testing each alternative's anchor at every position
+_SECTION_HEADER_RE = re.compile(r'^[^\S\n]*#+[^\S\n]*(?:' + "|".join(
+    f"(?P<{key}>{_header_body_pattern(pattern)})" for key, pattern in _SECTION_PATTERNS) + ")", re.IGNORECASE | re.MULTILINE)
+# The patterns have no capture groups of their own, so match.lastindex is the 1-based position of the
+# matching alternative; indexing this tuple with it avoids looking up match.lastgroup's name
+_SECTION_KEYS = (None,) + tuple(key for key, _ in _SECTION_PATTERNS)
+# Same headers as whole lines of plain (e.g. PyMuPDF) text, where the leading '#' is optional; used to
+# recover sections locally before asking the LLM. As with _SECTION_HEADER_RE, the shared line start and
+# optional '#' prefix are matched once, ahead of the alternatives
+_PLAIN_SECTION_HEADER_RE = re.compile(r'^[^\S\n]*(?:#+[^\S\n]*)?(?:' + "|".join(
+    f"(?P<{key}>{_header_body_pattern(pattern)})" for key, pattern in _SECTION_PATTERNS) + ")", re.IGNORECASE | re.MULTILINE)
+_LOCAL_SECTION_MAX_CHARS = 4000 # Cap on text taken after a locally found header
+
+# Looser heading-like lines for the sections the LLM may be asked for: optional '#'s and numbering (arabic or
+# roman), up to three capitalized words, a capitalized section keyword and a short remainder
+# ("4. Experimental Results and Analysis"). They locate the excerpts sent to the LLM instead of the whole text
+_SECTION_KEYWORDS = (
+    ("abstract", r'abstract|summary'),
+    ("introduction", r'introduction|background'),
+    ("methodology", r'method(?:s|ology)?|materials|experimental|approach|study\s+design'),
+    ("results", r'results|findings|evaluation|experiments'),
+    ("discussion", r'discussion'),
+    ("conclusion", r'conclusions?|concluding'),
+)
+_SECTION_HEADING_LINE_RES = {
+    key: re.compile(rf'^[^\S\n]*(?:#+[^\S\n]*)?(?:(?:\d+(?:\.\d+)*|[IVX]+)\.?[^\S\n]*)?(?:[A-Z][A-Za-z]*[^\S\n]+){{0,3}}'
+                    rf'(?=[A-Z])(?i:{keywords})\b[^\n]{{0,60}}$', re.MULTILINE)
+    for key, keywords in _SECTION_KEYWORDS
+}
+
+def _section_excerpts(text: str, section_names: List[str], window_chars: int) -> Optional[str]:
+    """
+    Join the text windows (window_chars long) starting at a heading-like line of each named section,
+    merging overlaps and keeping document order. None if any section has no such line, since the LLM
+    could then only find it in the full text.
+    """
+    spans = []
+    for section_name in section_names:
+        heading_re = _SECTION_HEADING_LINE_RES.get(section_name)
+        heading_match = heading_re.search(text) if heading_re else None
+        if not heading_match:
+            return None
+        spans.append((heading_match.start(), min(len(text), heading_match.start() + window_chars)))
+    spans.sort()
+    merged = [list(spans[0])]
+    for start, end in spans[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return "\n...\n".join(text[start:end] for start, end in merged)
+
+class _SectionInferenceBatcher:
+    """
+    Combine section-inference requests from concurrently processed PDFs into one LLM call.
+
+    Requests are collected until max_docs are waiting, their texts would exceed max_chars, or wait_seconds
+    have passed since the first one; the batch is then sent as a single prompt asking for a JSON object keyed
+    by document id. Each caller gets its own document's sections, or None (batch of one, failed call, or
+    missing document in the response), in which case it sends its own request as usual.
+    """
+
+    def __init__(self, llm_client: LLMClient, max_docs: int, max_chars: int, wait_seconds: float):
+        self.llm_client = llm_client
+        self.max_docs = max_docs
+        self.max_chars = max_chars
+        self.wait_seconds = wait_seconds
+        self._pending: List[Tuple[asyncio.Future, str, List[str]]] = []
+        self._pending_chars = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set() # Strong references to in-flight batch calls
+
+    async def infer(self, text_snippet: str, sections_to_infer: List[str]) -> Optional[Dict[str, Any]]:
+        """Queue one document's request and wait for its part of the batched response."""
+        if len(text_snippet) > self.max_chars:
+            return None # Too large to share a prompt
+        if self._pending_chars + len(text_snippet) > self.max_chars:
+            self._flush()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((future, text_snippet, sections_to_infer))
+        self._pending_chars += len(text_snippet)
+        if len(self._pending) >= self.max_docs:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.wait_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_chars = self._pending, [], 0
+        batch = [item for item in batch if not item[0].done()] # Drop requests whose callers were cancelled
+        if len(batch) == 1:
+            batch[0][0].set_result(None) # Nothing to share; the caller uses its usual single-document prompt
+        elif batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[asyncio.Future, str, List[str]]]) -> None:
+        documents = "\n\n".join(
+            f"=== Document doc{i} (sections: {', '.join(sections_to_infer)}) ===\n{text_snippet}"
+            for i, (_, text_snippet, sections_to_infer) in enumerate(batch, 1))
+        batch_prompt = f"""
+Below are {len(batch)} separate scientific papers (possibly truncated or excerpted). For EACH document, extract the content
+of ONLY the sections listed in its header line, using only that document's own text.
+If a listed section is clearly not present in a document, provide an empty string "" for its value.
+Focus on capturing the core content for each requested section accurately and completely.
+
+{documents}
+
+Respond ONLY with a valid JSON object whose keys are the document ids (doc1 ... doc{len(batch)}); each value is an object
+whose keys are that document's listed section names and whose values are the extracted text strings.
+Example: {{"doc1": {{"introduction": "...", "results": ""}}, "doc2": {{"discussion": "..."}}}}
+"""
+        logger.info(f"Sending one batched LLM section inference request for {len(batch)} documents.")
+        try:
+            response = await self.llm_client.extract_json(batch_prompt)
+        except Exception as e:
+            logger.warning(f"Batched LLM section inference failed ({e}); documents will be inferred individually.")
+            response = None
+        for i, (future, _, _) in enumerate(batch, 1):
+            doc_sections = response.get(f"doc{i}") if isinstance(response, dict) else None
+            if not future.done():
+                future.set_result(doc_sections if isinstance(doc_sections, dict) else None)
+
 class PDFProcessor:
     """Process PDF files to extract text and metadata"""
 
@@ -60,19 +576,162 @@ class PDFProcessor:
         pdf_params = self.params.get('pdf', {})
         self.extract_method = pdf_params.get("extract_method", "docling" if DOCLING_AVAILABLE else "pymupdf")
         self.search_metadata = pdf_params.get("search_metadata", bool(self.metadata_fetcher and self.metadata_fetcher.enabled))
+        self.speculative_metadata_search = pdf_params.get("speculative_metadata_search", False)
         self.max_text_length = pdf_params.get("max_text_length", 150000)
-        self.language_detection = pdf_params.get("language_detection", True) and LANGDETECT_AVAILABLE
+        self.language_model_path = pdf_params.get("language_model_path")
+        self._lid_model = self._load_lid_model(self.language_model_path)
+        self.language_detection = pdf_params.get("language_detection", True) and (self._lid_model is not None or LANGDETECT_AVAILABLE)
         self.docling_options_config = pdf_params.get("docling_options", {})
+        self._language_cache: "OrderedDict[str, Optional[str]]" = OrderedDict() # LRU keyed by snippet text
+        self._converter_cache: Dict[tuple, Any] = {} # DocumentConverters keyed by pipeline options; model loads are expensive
+        self._converter_lock = asyncio.Lock() # Serializes building (and model-loading) new converters
+        # Optional process pool for Docling conversions; each worker loads its own models, so size it to fit memory
+        docling_process_workers = self.docling_options_config.get("process_workers") or 0
+        self._docling_pool = None
+        if docling_process_workers > 0 and DOCLING_AVAILABLE:
+            self._docling_pool = ProcessPoolExecutor(max_workers=docling_process_workers, mp_context=multiprocessing.get_context("spawn"))
+        self._llm_calls_saved = 0 # Section-inference LLM calls avoided by local header recovery or well-parsed sections
+        section_cache_dir = pdf_params.get("section_cache_dir")
+        self.section_cache_dir = os.path.expanduser(section_cache_dir) if section_cache_dir else None
+        section_cache_ttl_days = pdf_params.get("section_cache_ttl_days", 30)
+        self.section_cache_ttl_seconds = float(section_cache_ttl_days) * 86400 if section_cache_ttl_days is not None else None
+        self.section_window_chars = pdf_params.get("section_window_chars", 6000) # 0/None: always send the full text
+        section_batch_size = pdf_params.get("section_batch_size", 1)
+        self._section_batcher = _SectionInferenceBatcher(
+            llm_client, section_batch_size,
+            pdf_params.get("section_batch_max_chars", 60000),
+            pdf_params.get("section_batch_wait_ms", 50) / 1000,
+        ) if section_batch_size and section_batch_size > 1 else None
+        # Dedicated, small pool for blocking Docling calls; the default executor (up to 32 threads)
+        # oversubscribes the CPU on top of Docling's own internal threads
+        self._blocking_pool = ThreadPoolExecutor(max_workers=max(1, pdf_params.get("extract_workers", 2)), thread_name_prefix="pdf-extract")
+        # MuPDF is not thread-safe, so every in-process fitz call (open, read, close) runs on this one thread, never on
+        # the event loop or _blocking_pool; large documents are read by separate processes in the page pool instead
+        self._fitz_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-fitz")
+        torch_threads = pdf_params.get("torch_threads")
+        if torch_threads:
+            _set_torch_threads(torch_threads)
+        self.docling_threaded = self.docling_options_config.get("use_threaded_pipeline", False)
+        if self.docling_threaded and not DOCLING_THREADED_AVAILABLE:
+            logger.warning("Docling threaded pipeline requested but not available in the installed Docling. Using the standard pipeline.")
+            self.docling_threaded = False
+        if self.docling_threaded:
+            # Process-wide Docling settings: larger/more concurrent page batches raise throughput but also GPU memory use
+            for perf_key in ("page_batch_size", "page_batch_concurrency"):
+                perf_value = self.docling_options_config.get(perf_key)
+                if perf_value is not None:
+                    setattr(docling_settings.perf, perf_key, perf_value)
+        # Converter options are fixed for the processor's lifetime; build them once so every PDF (and warm_up)
+        # reuses the same cached, model-loaded converters
+        self._full_docling_args = self._full_converter_args()
+        self._title_docling_args = self._title_converter_args()
 
         if self.extract_method == "docling" and not DOCLING_AVAILABLE:
             logger.warning("Docling extract method configured but Docling library not found. Falling back to PyMuPDF.")
             self.extract_method = "pymupdf"
-        if self.language_detection and not LANGDETECT_AVAILABLE:
-            logger.warning("Language detection enabled but langdetect library not found. Disabling detection.")
+        self.pdftotext_path = shutil.which("pdftotext") if self.extract_method == "pdftotext" else None
+        if self.extract_method == "pdftotext" and not self.pdftotext_path:
+            logger.warning("pdftotext extract method configured but the pdftotext binary (Poppler) was not found on PATH. Falling back to PyMuPDF.")
+            self.extract_method = "pymupdf"
+        if pdf_params.get("language_detection", True) and not self.language_detection:
+            logger.warning("Language detection enabled but neither a fastText model nor langdetect is available. Disabling detection.")
             self.language_detection = False
+        if self.language_detection and self._lid_model is None:
+            _init_langdetect(pdf_params.get("language_detection_languages", _DEFAULT_LANGDETECT_LANGUAGES))
 
         logger.info(f"PDFProcessor initialized with extraction method: {self.extract_method}")
 
+    async def prefetch_metadata(self, pdf_paths: List[str]) -> int:
+        """
+        Warm the metadata fetcher's cache for a corpus before per-PDF processing starts.
+
+        Reads each PDF's embedded title/author and looks them all up in one de-duplicated, concurrent
+        batch. extract_text_from_pdf then gets cache hits whenever its validated title matches the
+        embedded one; when it does not (e.g. Docling found a different title), the prefetched query is wasted.
+
+        Args:
+            pdf_paths: Paths of the PDFs that are about to be processed.
+
+        Returns:
+            Number of distinct lookups issued.
+        """
+        if not (self.search_metadata and self.metadata_fetcher and self.metadata_fetcher.enabled) or not pdf_paths:
+            return 0
+
+        def _read_queries() -> List[Tuple[str, Optional[str]]]:
+            queries = []
+            for path in pdf_paths:
+                try:
+                    with fitz.open(path) as doc:
+                        raw = doc.metadata or {}
+                except Exception as e:
+                    logger.debug(f"Skipping metadata prefetch for {path}: {e}")
+                    continue
+                title = (raw.get("title") or "").strip()
+                if title:
+                    authors = _split_names(raw.get("author") or "")
+                    queries.append((title, authors[0] if authors else None))
+            return queries
+
+        loop = asyncio.get_running_loop()
+        queries = await loop.run_in_executor(self._fitz_pool, _read_queries)
+        unique_queries = list({self.metadata_fetcher._query_key(t, a): (t, a) for t, a in queries}.values())
+        if unique_queries:
+            logger.info(f"Prefetching metadata for {len(unique_queries)} distinct titles ({len(pdf_paths)} PDFs)")
+            await self.metadata_fetcher.search_scholar_metadata_batch(unique_queries)
+        return len(unique_queries)
+
+    async def process_batch(self, pdf_paths: List[str], concurrency: Optional[int] = None,
+                            progress_callback: Optional[Callable[[str, bool], None]] = None,
+                            process: Optional[Callable[[str], Awaitable[Any]]] = None
+                            ) -> List[Tuple[str, Any]]:
+        """
+        Run extract_text_from_pdf (or process) over many PDFs concurrently, isolating failures per file.
+
+        Args:
+            pdf_paths: Paths of the PDFs to process.
+            concurrency: Maximum number of PDFs processed at once (network work overlaps; blocking
+                         extraction is further bounded by the extraction pools). Defaults to the CPU count.
+            progress_callback: Optional callable invoked as callback(pdf_path, succeeded) after each PDF.
+            process: Optional coroutine function run per PDF path instead of extract_text_from_pdf, e.g. the
+                     full per-paper pipeline, which then gets the same workers, read-ahead and failure isolation.
+
+        Returns:
+            List of (pdf_path, result) in input order, where result is what process returned (by default the
+            extraction dict, or None if extraction failed), or the exception raised while processing that PDF.
+        """
+        process = process or self.extract_text_from_pdf
+        concurrency = max(1, concurrency if concurrency is not None else os.cpu_count() or 4)
+        results: List[Tuple[str, Any]] = [None] * len(pdf_paths)
+        # Read ahead: the PDFs the workers take first are prefetched now, and each started PDF prefetches
+        # the one `concurrency` places further on, so disk reads overlap with parsing/conversion. The advice
+        # is fire-and-forget on the default executor, since open() itself can block on cold or network filesystems
+        loop = asyncio.get_running_loop()
+        for pdf_path in pdf_paths[:concurrency]:
+            loop.run_in_executor(None, _prefetch_file, pdf_path)
+        # A fixed set of workers pulls from one shared iterator, so only `concurrency` tasks exist at a
+        # time however long the batch is (instead of one pending coroutine per PDF)
+        pending = iter(enumerate(pdf_paths))
+
+        async def _worker() -> None:
+            for index, pdf_path in pending:
+                if index + concurrency < len(pdf_paths):
+                    loop.run_in_executor(None, _prefetch_file, pdf_paths[index + concurrency])
+                try:
+                    outcome = await process(pdf_path)
+                except Exception as e:
+                    logger.error(f"Unhandled error processing {pdf_path}: {e}", exc_info=True)
+                    outcome = e
+                results[index] = (pdf_path, outcome)
+                if progress_callback:
+                    try:
+                        progress_callback(pdf_path, outcome is not None and not isinstance(outcome, Exception))
+                    except Exception as cb_err:
+                        logger.warning(f"Progress callback failed for {pdf_path}: {cb_err}")
+
+        await asyncio.gather(*(_worker() for _ in range(min(concurrency, len(pdf_paths)))))
+        return results
+
     async def extract_text_from_pdf(self, pdf_path: str) -> Optional[Dict[str, Any]]:
         """
         Extract structured text and metadata from a PDF file. Opens fitz.Document lazily.
@@ -88,6 +747,12 @@ class PDFProcessor:
         title_for_search = None
         basic_metadata = {"title": "", "authors_str": "", "subject": "", "keywords_str": "", "doi": ""}
         first_author_for_search = None
+        cleaned_authors: List[str] = []
+        first_page_texts: Optional[List[str]] = None # First-page text variants for title validation (None: not read)
+        first_page_text: Optional[str] = None # Raw first-page text, reused by PyMuPDF extraction
+        speculative_search: Optional[asyncio.Task] = None # Online lookup of the embedded title started before Docling
+        speculative_key = None
+        page_count: Optional[int] = None # Read with the metadata so Docling's page budget needs no extra open
 
         try:
             # --- Step 0: Initial Basic Metadata Extraction (if possible without full open) ---
@@ -95,29 +760,51 @@ class PDFProcessor:
             # For simplicity here, we'll open briefly just for metadata initially, then close.
             # This is still better than keeping it open throughout.
             try:
-                with fitz.open(pdf_path) as temp_doc:
-                    pdf_metadata_raw = temp_doc.metadata or {}
-                    basic_metadata["title"] = pdf_metadata_raw.get("title", "")
-                    basic_metadata["authors_str"] = pdf_metadata_raw.get("author", "")
-                    basic_metadata["subject"] = pdf_metadata_raw.get("subject", "")
-                    basic_metadata["keywords_str"] = pdf_metadata_raw.get("keywords", "")
-                    cleaned_authors = [a.strip() for a in basic_metadata["authors_str"].split(',') if a.strip()]
-                    first_author_for_search = cleaned_authors[0] if cleaned_authors else None
+                # Read the first page now too, so title validation never has to reopen the file
+                pdf_metadata_raw, page_count, first_page_text = await asyncio.get_running_loop().run_in_executor(
+                    self._fitz_pool, _read_pdf_basics, pdf_path)
+                basic_metadata["title"] = pdf_metadata_raw.get("title", "")
+                basic_metadata["authors_str"] = pdf_metadata_raw.get("author", "")
+                basic_metadata["subject"] = pdf_metadata_raw.get("subject", "")
+                basic_metadata["keywords_str"] = pdf_metadata_raw.get("keywords", "")
+                cleaned_authors = _split_names(basic_metadata["authors_str"])
+                first_author_for_search = cleaned_authors[0] if cleaned_authors else None
+                first_page_texts = [_normalize_for_title_match(first_page_text)] if first_page_text is not None else []
             except Exception as meta_err:
                 logger.warning(f"Could not open PDF briefly for basic metadata extraction: {meta_err}. Proceeding without it.")
                 # Basic metadata fields will remain empty
 
+            # Docling takes seconds per PDF; when the embedded title is already on the first page it will most
+            # likely be the title searched for, so look it up online while Docling runs
+            if (DOCLING_AVAILABLE and self.speculative_metadata_search and self.search_metadata and self.metadata_fetcher
+                    and basic_metadata["title"].strip() and first_page_texts):
+                speculative_key = _normalize_for_title_match(basic_metadata["title"])
+                if speculative_key and any(speculative_key in page_text for page_text in first_page_texts):
+                    speculative_search = asyncio.create_task(self.metadata_fetcher.search_scholar_metadata(
+                        basic_metadata["title"].strip(), first_author_for_search))
+
             # --- Step 1: Attempt Title Extraction ---
             # 1. Try extracting with Docling Header Method first
             docling_title_candidate = None
-            if DOCLING_AVAILABLE:
+            docling_converted = None # (markdown_text, first_page_markdown) when Docling is also the extraction method
+            if DOCLING_AVAILABLE and self.extract_method == "docling":
+                # One full conversion serves both the title (from its first page) and the text extraction below
+                docling_converted = await self._run_docling_full(pdf_path, page_count)
+                if docling_converted is None:
+                    logger.error(f"Text extraction failed for {pdf_path} using method 'docling'")
+                    return None
+                first_page_markdown_for_validation = docling_converted[1] or None
+                if first_page_markdown_for_validation:
+                    docling_title_candidate = self._title_from_markdown(first_page_markdown_for_validation)
+            elif DOCLING_AVAILABLE:
                 # This now returns (title_candidate, first_page_markdown) or (None, None)
                 docling_title_candidate, first_page_markdown_for_validation = await self._extract_title_with_docling(pdf_path)
+            if DOCLING_AVAILABLE:
                 if docling_title_candidate:
                     logger.info(f"Docling extracted title candidate: {docling_title_candidate}")
                     # Validate using the markdown text *from the same Docling run*
                     # Pass pdf_path for potential fallback validation inside _is_title_in_text
-                    if await self._is_title_in_text(title=docling_title_candidate, pdf_path=pdf_path, markdown_text=first_page_markdown_for_validation):
+                    if await self._is_title_in_text(title=docling_title_candidate, pdf_path=pdf_path, markdown_text=first_page_markdown_for_validation, first_page_texts=first_page_texts):
                         title_for_search = docling_title_candidate
                         logger.info(f"Title confirmed from Docling header: {title_for_search}")
                     else:
@@ -130,7 +817,7 @@ class PDFProcessor:
                 extracted_title_meta = basic_metadata["title"].strip()
                 logger.info(f"Trying title from basic PDF metadata: {extracted_title_meta}")
                 # Validate using Docling's markdown if available, otherwise fallback to PyMuPDF text check (which opens the file)
-                if await self._is_title_in_text(title=extracted_title_meta, pdf_path=pdf_path, markdown_text=first_page_markdown_for_validation):
+                if await self._is_title_in_text(title=extracted_title_meta, pdf_path=pdf_path, markdown_text=first_page_markdown_for_validation, first_page_texts=first_page_texts):
                     title_for_search = extracted_title_meta
                     logger.info(f"Title confirmed from basic PDF metadata: {title_for_search}")
                 else:
@@ -140,13 +827,10 @@ class PDFProcessor:
 
             # 3. If title still not found, try guessing from filename
             if not title_for_search:
-                filename_title = os.path.splitext(os.path.basename(pdf_path))[0].replace('_', ' ')
-                # Basic cleaning for filename titles
-                filename_title = re.sub(r'^\d+[-_]?\s*', '', filename_title) # Remove leading numbers/hyphens/underscores
-                filename_title = filename_title.strip()
+                filename_title = _title_from_filename(pdf_path)
                 logger.info(f"Trying title guessed from filename: {filename_title}")
                 # _is_title_in_text will handle opening the PDF if markdown_text is None/failed
-                if await self._is_title_in_text(title=filename_title, pdf_path=pdf_path, markdown_text=first_page_markdown_for_validation):
+                if await self._is_title_in_text(title=filename_title, pdf_path=pdf_path, markdown_text=first_page_markdown_for_validation, first_page_texts=first_page_texts):
                     title_for_search = filename_title
                     logger.info(f"Title confirmed from filename guess: {title_for_search}")
                 else:
@@ -163,43 +847,26 @@ class PDFProcessor:
 
             # Metadata Search (SerpApi) - Only search if we have a title
             online_metadata = None
-            if self.search_metadata and self.metadata_fetcher:
+            if speculative_search is not None and _normalize_for_title_match(title_for_search) == speculative_key:
+                online_metadata = await speculative_search # Same query, already in flight (or done)
+            elif self.search_metadata and self.metadata_fetcher:
                 online_metadata = await self.metadata_fetcher.search_scholar_metadata(
                     title_for_search,
                     first_author_for_search # Use author from basic metadata extraction
                 )
 
             # Consolidate Metadata
-            final_metadata = {
-                "title": (online_metadata or {}).get("title") or basic_metadata["title"],
-                "authors": (online_metadata or {}).get("authors", []),
-                "doi": (online_metadata or {}).get("doi") or basic_metadata["doi"],
-                "journal": (online_metadata or {}).get("journal", ""),
-                "publicationDate": (online_metadata or {}).get("publicationDate") or (online_metadata or {}).get("year"),
-                "year": (online_metadata or {}).get("year", ""),
-                "volume": (online_metadata or {}).get("volume", ""),
-                "issue": (online_metadata or {}).get("issue", ""),
-                "pages": (online_metadata or {}).get("pages", ""),
-                "keywords": (online_metadata or {}).get("keywords", []),
-                "abstract": (online_metadata or {}).get("abstract", ""),
-                "fileUrl": (online_metadata or {}).get("fileUrl", ""),
-                "pdfPath": (online_metadata or {}).get("pdfPath") # Path from online source, if any
-            }
-
-            # Fill missing fields from basic_metadata if needed
-            if not final_metadata["authors"] and basic_metadata["authors_str"]:
-                 cleaned_authors = [a.strip() for a in basic_metadata["authors_str"].split(',') if a.strip()]
-                 final_metadata["authors"] = [{"name": name} for name in cleaned_authors]
-            if not final_metadata["keywords"] and basic_metadata["keywords_str"]:
-                final_metadata["keywords"] = [kw.strip() for kw in re.split(r'[;,]', basic_metadata["keywords_str"]) if kw.strip()]
+            final_metadata = _merge_metadata(basic_metadata, online_metadata, cleaned_authors)
 
             # --- Step 3: Text & Section Extraction ---
             extraction_result = None
             if self.extract_method == "docling":
-                extraction_result = await self._extract_with_docling(pdf_path, final_metadata)
+                extraction_result = await self._extract_with_docling(pdf_path, final_metadata, docling_converted)
+            elif self.extract_method == "pdftotext":
+                extraction_result = await self._extract_with_pdftotext(pdf_path, final_metadata)
             elif self.extract_method == "pymupdf":
                 # Now, _extract_with_pymupdf needs to handle opening the document
-                extraction_result = await self._extract_with_pymupdf(pdf_path, final_metadata) # Pass pdf_path
+                extraction_result = await self._extract_with_pymupdf(pdf_path, final_metadata, first_page_text) # Pass pdf_path
             else:
                 logger.error(f"Unsupported extraction method '{self.extract_method}' configured.")
                 return None
@@ -225,10 +892,34 @@ class PDFProcessor:
         except Exception as e:
             logger.error(f"General error processing PDF {pdf_path}: {str(e)}", exc_info=True)
             return None
-        # No 'finally' block needed here to close 'doc', as it's managed within methods using 'with'
+        finally:
+            # A speculative lookup for a title that was not used is abandoned (no-op once it has been awaited)
+            if speculative_search is not None and not speculative_search.done():
+                speculative_search.cancel()
+
+
+    @staticmethod
+    def _read_first_page_text(doc: Any) -> Optional[str]:
+        """
+        Extract the first page's plain text with the same flags as full PyMuPDF extraction, so the text can
+        serve both title validation and _extract_with_pymupdf. None for an empty document or on error.
+        """
+        if len(doc) == 0:
+            return None
+        try:
+            return doc[0].get_text("text", flags=_TEXT_FLAGS)
+        except Exception as page_extract_err:
+            logger.warning(f"Error extracting text from first page: {page_extract_err}")
+            return None
 
+    @classmethod
+    def _read_first_page_texts(cls, doc: Any) -> List[str]:
+        """Extract the first page's text, normalized for title matching (empty list for an empty document)."""
+        page_text = cls._read_first_page_text(doc)
+        return [_normalize_for_title_match(page_text)] if page_text is not None else []
 
-    async def _is_title_in_text(self, title: str, pdf_path: str, markdown_text: Optional[str] = None) -> bool:
+    async def _is_title_in_text(self, title: str, pdf_path: str, markdown_text: Optional[str] = None,
+                                first_page_texts: Optional[List[str]] = None) -> bool:
         """
         Check if the extracted title appears in the document text.
         Prioritizes checking against provided markdown_text (from Docling).
@@ -240,6 +931,8 @@ class PDFProcessor:
             pdf_path (str): The path to the PDF file (used for fallback check).
             markdown_text (Optional[str]): Markdown text of the first page (or more)
                                             extracted by Docling, if available.
+            first_page_texts (Optional[List[str]]): First-page PyMuPDF text already read (and normalized)
+                                            by _read_first_page_texts; when given, the PDF is not reopened.
 
         Returns:
             bool: True if the title is found in the text, False otherwise.
@@ -248,8 +941,8 @@ class PDFProcessor:
             logger.warning("Title validation skipped: No title provided.")
             return False
 
-        title_lower = title.strip().lower()
-        if not title_lower:
+        title_norm = _normalize_for_title_match(title)
+        if not title_norm:
             logger.warning("Title validation skipped: Title is empty after stripping.")
             return False
 
@@ -258,7 +951,7 @@ class PDFProcessor:
             logger.debug(f"Attempting title validation using provided markdown text for '{title}'.")
             try:
                 # Simple substring check on the markdown
-                if title_lower in markdown_text.lower():
+                if title_norm in _normalize_page_for_title_match(markdown_text):
                     logger.info(f"Validated title '{title}' found in Docling markdown.")
                     return True
                 else:
@@ -271,36 +964,27 @@ class PDFProcessor:
         # --- Priority 2: Check PyMuPDF Document Text (Fallback or if no markdown provided) ---
         logger.debug(f"Validating title '{title}' using PyMuPDF document text for path: {pdf_path}")
         try:
-            # Open the document using 'with' statement only when needed for this check
-            with fitz.open(pdf_path) as doc:
-                # Check first page first
-                if len(doc) > 0:
-                    page = doc.load_page(0)
-                    # Try different text extraction flags for robustness
-                    flags_to_try = [
-                        fitz.TEXT_INHIBIT_SPACES, # Tries to remove extra spaces
-                        fitz.TEXT_PRESERVE_LIGATURES, # Default flags
-                        0 # No flags
-                    ]
-                    for flag in flags_to_try:
-                        try:
-                            page_text = page.get_text("text", flags=flag)
-                            if title_lower in page_text.lower():
-                                logger.info(f"Validated title '{title}' found in PyMuPDF first page text (flags={flag}).")
-                                return True
-                        except Exception as page_extract_err:
-                            logger.warning(f"Error extracting text from first page with flags={flag}: {page_extract_err}")
-                    logger.debug(f"Title '{title}' not found on first page with various flags.")
-                else:
-                    logger.warning(f"PDF {pdf_path} has no pages. Cannot validate title.")
-                    return False
+            if first_page_texts is None:
+                # Open the document only when needed for this check
+                first_page_texts = await asyncio.get_running_loop().run_in_executor(
+                    self._fitz_pool, _read_first_page_texts_from_file, pdf_path)
+            if not first_page_texts:
+                logger.warning(f"PDF {pdf_path} has no pages. Cannot validate title.")
+                return False
 
-                # Optional: Check subsequent pages if needed (consider performance implications)
-                # ... (logic for checking more pages would go here if desired) ...
+            # Check the (normalized) first page text
+            for page_text in first_page_texts:
+                if title_norm in page_text:
+                    logger.info(f"Validated title '{title}' found in PyMuPDF first page text.")
+                    return True
+            logger.debug(f"Title '{title}' not found on first page.")
 
-                # If not found on first page (and subsequent pages if checked)
-                logger.warning(f"Title candidate '{title}' NOT found in PyMuPDF document text (checked first page).")
-                return False
+            # Optional: Check subsequent pages if needed (consider performance implications)
+            # ... (logic for checking more pages would go here if desired) ...
+
+            # If not found on first page (and subsequent pages if checked)
+            logger.warning(f"Title candidate '{title}' NOT found in PyMuPDF document text (checked first page).")
+            return False
 
         except fitz.fitz.FileNotFoundError:
              logger.error(f"PyMuPDF check failed: File not found at {pdf_path}")
@@ -312,7 +996,6 @@ class PDFProcessor:
             # Catch other potential PyMuPDF errors (e.g., password protected, rendering issues)
             logger.error(f"Error checking title in PyMuPDF for {pdf_path}: {e}", exc_info=True)
             return False
-        # 'doc' is automatically closed by 'with' statement
 
     async def _extract_title_with_docling(self, pdf_path: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -326,59 +1009,14 @@ class PDFProcessor:
             logger.warning("Docling is not available. Cannot extract title using Docling.")
             return None, None
         try:
-            # Configure Docling pipeline options for minimal conversion of first page
-            pipeline_opts = PdfPipelineOptions(
-                max_num_pages=1,
-                enable_remote_services=self.docling_options_config.get("enable_remote_services", False), # Use config here too
-                do_code_enrichment=False, do_formula_enrichment=False,
-                do_picture_classification=False, do_picture_description=False,
-                generate_picture_images=False, do_table_structure=False,
-            )
-            converter = DocumentConverter(format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_opts)})
-
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, lambda: converter.convert(pdf_path))
+            exported = await self._docling_to_text(pdf_path, self._title_docling_args)
 
-            if result and result.document:
-                markdown_text = result.document.export_to_markdown()
+            if exported:
+                markdown_text = exported[0]
                 if not markdown_text:
                     logger.warning("Docling conversion yielded empty markdown text.")
                     return None, None
-
-                lines = markdown_text.splitlines()
-                min_header_level = float('inf') # Start with infinity
-                first_title_at_min_level = None
-
-                # First pass: Find the minimum header level present
-                for line in lines:
-                    line_stripped = line.strip()
-                    if line_stripped.startswith('#'):
-                        match = re.match(r'^(#+)\s*(.*)', line_stripped)
-                        if match:
-                            heading_text = match.group(2).strip()
-                            if heading_text: # Ignore empty headings
-                                header_level = len(match.group(1))
-                                min_header_level = min(min_header_level, header_level)
-
-                # Second pass: Find the *first* header matching the minimum level
-                if min_header_level != float('inf'): # Check if any header was found
-                    for line in lines:
-                        line_stripped = line.strip()
-                        if line_stripped.startswith('#'):
-                             match = re.match(r'^(#+)\s*(.*)', line_stripped)
-                             if match:
-                                 header_level = len(match.group(1))
-                                 heading_text = match.group(2).strip()
-                                 if header_level == min_header_level and heading_text:
-                                     first_title_at_min_level = heading_text
-                                     logger.info(f"Found potential title header (Level {min_header_level}): '{first_title_at_min_level}'")
-                                     break # Stop after finding the first one at the min level
-
-                if first_title_at_min_level:
-                    return first_title_at_min_level, markdown_text
-                else:
-                    logger.warning("No suitable markdown headings found by Docling on the first page.")
-                    return None, markdown_text # Return markdown even if no title found
+                return self._title_from_markdown(markdown_text), markdown_text # Markdown is returned even if no title found
             else:
                 logger.warning("Docling conversion did not yield a result or document.")
                 return None, None
@@ -387,15 +1025,41 @@ class PDFProcessor:
             logger.error(f"Error during Docling title extraction/conversion: {e}", exc_info=True)
             return None, None
 
-    async def _extract_with_docling(self, pdf_path: str, initial_metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Extract text using Docling's DocumentConverter."""
-        if not DOCLING_AVAILABLE:
-            return None
-        logger.info(f"Extracting text using Docling for {pdf_path}")
-        metadata = initial_metadata.copy()
-        try:
-            # Configure Docling pipeline options from params
-            pipeline_opts = PdfPipelineOptions(
+    @staticmethod
+    def _title_from_markdown(markdown_text: str) -> Optional[str]:
+        """Return the first non-empty heading at the lowest header level (e.g. # before ##) in first-page markdown, or None."""
+        min_header_level = float('inf') # Start with infinity
+        first_title_at_min_level = None
+
+        # The title sits near the top, so only the first _TITLE_SCAN_LINES lines are considered
+        scan_end = -1
+        for _ in range(_TITLE_SCAN_LINES):
+            scan_end = markdown_text.find('\n', scan_end + 1)
+            if scan_end < 0:
+                scan_end = len(markdown_text)
+                break
+
+        # Single pass: keep the first non-empty heading at the lowest level seen so far
+        for match in _HEADER_RE.finditer(markdown_text, 0, scan_end):
+            header_level = len(match.group(1))
+            if header_level < min_header_level:
+                heading_text = match.group(2).strip()
+                if heading_text: # Ignore empty headings
+                    min_header_level = header_level
+                    first_title_at_min_level = heading_text
+                    if header_level == 1: # Nothing can rank above a level-1 heading
+                        break
+
+        if first_title_at_min_level:
+            logger.info(f"Found potential title header (Level {min_header_level}): '{first_title_at_min_level}'")
+        else:
+            logger.warning("No suitable markdown headings found by Docling on the first page.")
+        return first_title_at_min_level
+
+    def _full_converter_args(self) -> tuple:
+        """Converter arguments (see _build_docling_converter) for full-document conversion, from the docling_options params."""
+        return (
+            dict(
                 artifacts_path=self.docling_options_config.get("artifacts_path"),
                 enable_remote_services=self.docling_options_config.get("enable_remote_services", False),
                 do_code_enrichment=self.docling_options_config.get("do_code_enrichment", False),
@@ -405,17 +1069,106 @@ class PDFProcessor:
                 generate_picture_images=self.docling_options_config.get("generate_picture_images", False),
                 images_scale=self.docling_options_config.get("images_scale", 2),
                 do_table_structure=self.docling_options_config.get("do_table_structure", True),
-            )
-            # Set TableFormer mode
-            tf_mode_str = self.docling_options_config.get("table_structure_mode", "ACCURATE").upper()
-            pipeline_opts.table_structure_options.mode = TableFormerMode.FAST if tf_mode_str == "FAST" else TableFormerMode.ACCURATE
-            pipeline_opts.table_structure_options.do_cell_matching = self.docling_options_config.get("table_do_cell_matching", True)
-
-            converter = DocumentConverter(
-                format_options={
-                    InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_opts)
-                }
-            )
+            ),
+            self.docling_options_config.get("table_structure_mode", "ACCURATE").upper(),
+            self.docling_options_config.get("table_do_cell_matching", True),
+            self.docling_threaded,
+        )
+
+    def _title_converter_args(self) -> tuple:
+        """Converter arguments for the minimal first-page conversion used to find a title."""
+        return (dict(
+            max_num_pages=1,
+            enable_remote_services=self.docling_options_config.get("enable_remote_services", False), # Use config here too
+            do_code_enrichment=False, do_formula_enrichment=False,
+            do_picture_classification=False, do_picture_description=False,
+            generate_picture_images=False, do_table_structure=False,
+        ), None, None, False)
+
+    async def warm_up(self) -> None:
+        """
+        Load the Docling models this processor will use before the first PDF arrives, so the load is paid
+        up front instead of inside the first conversion (and once, not raced by concurrently starting PDFs).
+
+        No-op when Docling is unavailable or conversions run in worker processes (each worker loads its own models).
+        """
+        if not DOCLING_AVAILABLE or self._docling_pool is not None:
+            return
+        converter_args = self._full_docling_args if self.extract_method == "docling" else self._title_docling_args
+        started = time.time()
+        try:
+            await self._get_docling_converter(*converter_args)
+        except Exception as e:
+            logger.warning(f"Docling warm-up failed ({e}); models will be loaded on first use.")
+            return
+        logger.info(f"Docling models loaded in {time.time() - started:.1f}s")
+
+    async def _get_docling_converter(self, pipeline_kwargs: Dict[str, Any], table_mode: Optional[str] = None,
+                                     table_cell_matching: Optional[bool] = None, threaded: bool = False) -> Any:
+        """
+        Return a DocumentConverter for the given pipeline options (see _build_docling_converter), building it only on first use.
+
+        A new converter's PDF pipeline (layout/table models) is initialized once, off the event loop and
+        under a lock, so PDFs that start concurrently don't each load the same models.
+        """
+        key = (frozenset(pipeline_kwargs.items()), table_mode, table_cell_matching, threaded)
+        converter = self._converter_cache.get(key)
+        if converter is not None:
+            return converter
+        async with self._converter_lock:
+            converter = self._converter_cache.get(key)
+            if converter is not None: # Built by another task while we waited
+                return converter
+            converter = _build_docling_converter(pipeline_kwargs, table_mode, table_cell_matching, threaded)
+            await asyncio.get_running_loop().run_in_executor(self._blocking_pool, converter.initialize_pipeline, InputFormat.PDF)
+            self._converter_cache[key] = converter
+            logger.debug(f"Created Docling converter ({len(self._converter_cache)} cached)")
+        return converter
+
+    async def _docling_to_text(self, pdf_path: str, converter_args: tuple, convert_kwargs: Optional[Dict[str, Any]] = None,
+                               first_page: bool = False) -> Optional[Tuple[str, str, str]]:
+        """
+        Convert a PDF with Docling and return (markdown, plain_text_fallback, first_page_markdown), or None if
+        no document was produced. first_page_markdown is "" unless first_page is set.
+
+        Runs in the Docling process pool when one is configured (conversions then use several cores instead
+        of contending for the GIL); otherwise on the extraction thread pool with this processor's cached converter.
+        """
+        convert_kwargs = convert_kwargs or {}
+        loop = asyncio.get_running_loop()
+        if self._docling_pool is not None:
+            return await loop.run_in_executor(self._docling_pool, _docling_convert_worker, pdf_path, converter_args, convert_kwargs, first_page)
+        converter = await self._get_docling_converter(*converter_args)
+        return await loop.run_in_executor(self._blocking_pool, _convert_and_export, converter, pdf_path, convert_kwargs, first_page)
+
+    def close(self) -> None:
+        """Drop cached Docling converters (and their models) and the extraction pools; frees cached GPU memory when torch is in use."""
+        self._converter_cache.clear()
+        self._blocking_pool.shutdown(wait=False)
+        self._fitz_pool.shutdown(wait=False)
+        if self._docling_pool is not None:
+            self._docling_pool.shutdown(wait=False, cancel_futures=True)
+            self._docling_pool = None
+        _shutdown_page_pool()
+        torch = sys.modules.get("torch") # Only present if Docling loaded it; never import it just to clean up
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    async def _run_docling_full(self, pdf_path: str, page_count: Optional[int] = None) -> Optional[Tuple[str, str]]:
+        """
+        Convert the whole PDF (within the configured limits) with Docling.
+
+        page_count, when already known, spares reopening the PDF with PyMuPDF to size the page budget.
+
+        Returns:
+            Tuple: (markdown_text, first_page_markdown), where markdown_text falls back to Docling's plain
+            text export when the markdown is empty; None if the conversion failed or produced no text.
+        """
+        if not DOCLING_AVAILABLE:
+            return None
+        logger.info(f"Extracting text using Docling for {pdf_path}")
+        try:
+            converter_args = self._full_docling_args
 
             # Get limits from config
             max_pages = self.docling_options_config.get("max_num_pages")
@@ -428,31 +1181,54 @@ class PDFProcessor:
             if isinstance(max_size, int): convert_kwargs['max_file_size'] = max_size
             elif max_size is not None: logger.warning(f"Ignoring invalid docling_options.max_file_size: {max_size}")
 
+            if max_pages is None and self.max_text_length:
+                # Don't lay out pages whose text max_text_length would discard (estimate errs toward keeping pages)
+                page_budget = -(-self.max_text_length // _MIN_CHARS_PER_PAGE)
+                if page_count is None:
+                    page_count = await asyncio.get_running_loop().run_in_executor(self._fitz_pool, _page_count, pdf_path)
+                if page_count > page_budget:
+                    logger.info(f"Converting only the first {page_budget} of {page_count} pages of {pdf_path} (max_text_length)")
+                    convert_kwargs['page_range'] = (1, page_budget)
             logger.debug(f"Calling Docling convert with kwargs: {convert_kwargs}")
 
-            # Run conversion in executor thread
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, lambda: converter.convert(pdf_path, **convert_kwargs)
-            )
+            # Only the exported text comes back; the Docling document (pages, layout, tables) is released
+            # right after export instead of being held across later awaits
+            exported = await self._docling_to_text(pdf_path, converter_args, convert_kwargs, first_page=True)
 
-            if not result or not result.document:
+            if not exported:
                 logger.error(f"Docling conversion failed for {pdf_path}")
                 return None
 
-            markdown_text = result.document.export_to_markdown()
+            markdown_text, plain_text, first_page_markdown = exported
             if not markdown_text:
                  logger.error(f"Docling conversion resulted in empty markdown for {pdf_path}")
                  # Fallback to plain text extraction? Or return failure?
                  # Let's try plain text as a fallback if markdown is empty
-                 markdown_text = result.document.export_to_text()
+                 markdown_text = plain_text
                  if not markdown_text:
                      logger.error(f"Docling conversion also resulted in empty plain text for {pdf_path}")
                      return None # Return failure if both are empty
                  logger.warning(f"Using plain text extraction from Docling for {pdf_path} as markdown was empty.")
+            return markdown_text, first_page_markdown
+
+        except Exception as e:
+            logger.error(f"Error during Docling conversion for {pdf_path}: {str(e)}", exc_info=True)
+            return None
 
+    async def _extract_with_docling(self, pdf_path: str, metadata: Dict[str, Any],
+                                    converted: Optional[Tuple[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Extract text and sections using Docling's DocumentConverter.
 
-            language = await self._detect_language(markdown_text)
+        metadata is updated in place (e.g. the abstract) and returned in the result; it is not copied.
+        converted is a result of _run_docling_full already obtained for this PDF; the PDF is converted here if not given.
+        """
+        if converted is None:
+            converted = await self._run_docling_full(pdf_path)
+            if converted is None:
+                return None
+        markdown_text = converted[0]
+        try:
             # --- Section Parsing ---
             # Use markdown if available, otherwise attempt parsing on plain text (less reliable)
             sections = await self._parse_sections_from_markdown(markdown_text)
@@ -461,23 +1237,18 @@ class PDFProcessor:
             if not metadata.get("abstract") and sections.get("abstract"):
                 metadata["abstract"] = sections["abstract"][:1000] # Limit length
 
-            # Infer missing sections with LLM if needed
-            if not all(sections.get(s) for s in ["introduction", "methodology", "results", "discussion"]):
+            # Infer missing sections with LLM if needed; language detection runs while the LLM request is in flight
+            if not all(sections.get(s) for s in _CORE_SECTIONS):
                 logger.info("Attempting LLM section inference based on Docling output.")
                 # Pass markdown_text which might be markdown or plain text fallback
-                await self._infer_sections_with_llm(markdown_text, sections)
-
-            # Ensure required sections exist, possibly populated from 'misc'
-            required_sections = ["abstract", "introduction", "methodology", "results", "discussion", "conclusion", "references"]
-            misc_content = sections.get('misc', '') # Get misc content once
-            for section in required_sections:
-                if not sections.get(section):
-                    # If a required section is empty, try filling it from misc content
-                    # Simple approach: assign all misc content to the first missing required section?
-                    # Or maybe better to just leave them empty if not found/inferred? Let's leave empty.
-                    sections[section] = "" # Ensure key exists
-            sections.pop('misc', None) # Remove misc key after potential use or if unused
+                language, _ = await asyncio.gather(self._detect_language(markdown_text),
+                                                   self._infer_sections_with_llm(markdown_text, sections))
+            else:
+                language = await self._detect_language(markdown_text)
 
+            # Keep exactly the required sections, in a fixed order; missing ones are empty. 'misc' (content
+            # before the first known header) is dropped here, and every other parsed key is a required one
+            sections = {section: sections.get(section) or "" for section in _REQUIRED_SECTIONS}
 
             return {
                 "metadata": metadata,
@@ -490,52 +1261,68 @@ class PDFProcessor:
             logger.error(f"Error during Docling processing for {pdf_path}: {str(e)}", exc_info=True)
             return None
 
-    async def _extract_with_pymupdf(self, pdf_path: str, initial_metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Extract text using PyMuPDF (simpler layout analysis). Opens the document itself."""
+    async def _extract_with_pymupdf(self, pdf_path: str, metadata: Dict[str, Any],
+                                    first_page_text: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Extract text using PyMuPDF (simpler layout analysis). Opens the document itself.
+
+        metadata is returned in the result as is (not copied).
+
+        first_page_text, when already read (see _read_first_page_text), is used instead of extracting page 1 again.
+        """
         logger.info(f"Extracting text using PyMuPDF for {pdf_path}")
-        metadata = initial_metadata.copy()
         full_text = ""
-        sections = {
-            "abstract": metadata.get("abstract", ""),
-            "introduction": "", "methodology": "", "results": "",
-            "discussion": "", "conclusion": "", "references": ""
-        }
         try:
-            # Open the document within this method
-            with fitz.open(pdf_path) as doc:
-                logger.info(f"Processing {len(doc)} pages with PyMuPDF...")
-                for page_num, page in enumerate(doc):
-                    try:
-                        # Consider adding flags if needed: page.get_text("text", flags=...)
-                        full_text += page.get_text("text") + "\n"
-                    except Exception as page_err:
-                        logger.warning(f"Error extracting text from page {page_num+1} of {pdf_path}: {page_err}")
-                        full_text += f"[Content Extraction Error on Page {page_num+1}]\n"
-
-                if not full_text:
-                    logger.error(f"PyMuPDF extracted no text from {pdf_path}")
-                    return None
-
-                language = await self._detect_language(full_text)
-
-                logger.info("Attempting LLM section inference based on PyMuPDF full text.")
-                await self._infer_sections_with_llm(full_text, sections)
-
-                # Ensure required sections exist
-                required_sections = ["abstract", "introduction", "methodology", "results", "discussion", "conclusion", "references"]
-                for section in required_sections:
-                     sections.setdefault(section, "") # Ensure key exists, default empty
-
-                # Populate abstract if still missing and available in initial metadata
-                if not sections["abstract"] and metadata.get("abstract"):
-                    sections["abstract"] = metadata["abstract"]
+            if first_page_text is not None:
+                first_page, head = 1, [first_page_text] # Page 1 was already read (so the document has pages)
+            else:
+                first_page, head = 0, []
+
+            def _read_pages() -> Tuple[int, Optional[str]]:
+                """Open, read and close the document on the fitz thread; text is None when it is left to the page pool."""
+                with fitz.open(pdf_path) as doc:
+                    page_count = len(doc)
+                    logger.info(f"Processing {page_count} pages with PyMuPDF...")
+                    if page_count >= _PARALLEL_PAGE_THRESHOLD:
+                        return page_count, None
+                    parts = list(head)
+                    total_len = sum(len(page_text) + 1 for page_text in parts)
+                    stop_len = self.max_text_length # Later pages would only be truncated away
+                    if parts and total_len >= stop_len:
+                        return page_count, "\n".join(parts) + "\n"
+                    for page_num, page in enumerate(doc.pages(first_page), start=first_page):
+                        try:
+                            page_text = page.get_text("text", flags=_TEXT_FLAGS)
+                        except Exception as page_err:
+                            logger.warning(f"Error extracting text from page {page_num+1} of {pdf_path}: {page_err}")
+                            page_text = f"[Content Extraction Error on Page {page_num+1}]"
+                        parts.append(page_text)
+                        total_len += len(page_text) + 1
+                        if total_len >= stop_len:
+                            logger.debug(f"Stopping PyMuPDF extraction after page {page_num+1}; text exceeds max_text_length")
+                            break
+                    return page_count, "\n".join(parts) + "\n" if parts else "" # Every page's text ends with a newline
+
+            # Keep the event loop free while MuPDF works through the pages
+            loop = asyncio.get_running_loop()
+            page_count, full_text = await loop.run_in_executor(self._fitz_pool, _read_pages)
+            if full_text is None:
+                # Large documents: extract contiguous page ranges in worker processes, joined back in order
+                n_chunks = min(os.cpu_count() or 1, page_count - first_page)
+                bounds = [first_page + (page_count - first_page) * i // n_chunks for i in range(n_chunks + 1)]
+                pool = _get_page_pool()
+                chunks = await asyncio.gather(*(
+                    loop.run_in_executor(pool, _extract_pages, pdf_path, bounds[i], bounds[i + 1], self.max_text_length)
+                    for i in range(n_chunks)
+                ))
+                full_text = "".join(f"{page_text}\n" for page_text in head) + "".join(chunks)
+
+            if not full_text:
+                logger.error(f"PyMuPDF extracted no text from {pdf_path}")
+                return None
 
-                return {
-                    "metadata": metadata,
-                    "full_text": full_text[:self.max_text_length],
-                    "sections": sections,
-                    "language": language
-                }
+            logger.info("Attempting LLM section inference based on PyMuPDF full text.")
+            return await self._build_plain_text_result(full_text, metadata)
         except fitz.fitz.FileNotFoundError:
              logger.error(f"PyMuPDF extraction failed: File not found at {pdf_path}")
              return None
@@ -546,12 +1333,88 @@ class PDFProcessor:
             logger.error(f"Error during PyMuPDF processing for {pdf_path}: {str(e)}", exc_info=True)
             return None
 
+    async def _extract_with_pdftotext(self, pdf_path: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Extract plain text with Poppler's pdftotext in a single subprocess call. Falls back to PyMuPDF on failure."""
+        logger.info(f"Extracting text using pdftotext for {pdf_path}")
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                self.pdftotext_path, '-q', '-nopgbrk', '-enc', 'UTF-8', pdf_path, '-',
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await proc.communicate()
+        except OSError as e:
+            logger.error(f"Could not run pdftotext for {pdf_path}: {e}. Falling back to PyMuPDF.")
+            return await self._extract_with_pymupdf(pdf_path, metadata)
+
+        full_text = stdout.decode('utf-8', 'replace')
+        if proc.returncode != 0 or not full_text.strip():
+            logger.warning(f"pdftotext failed or produced no text for {pdf_path} (exit code {proc.returncode}: {stderr.decode('utf-8', 'replace').strip()}). Falling back to PyMuPDF.")
+            return await self._extract_with_pymupdf(pdf_path, metadata)
+
+        logger.info("Attempting LLM section inference based on pdftotext full text.")
+        return await self._build_plain_text_result(full_text, metadata)
+
+    async def _build_plain_text_result(self, full_text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Detect language and infer sections for plain (non-markdown) extracted text; shared by PyMuPDF and pdftotext."""
+        sections = dict.fromkeys(_REQUIRED_SECTIONS, "") # Every required key exists from the start
+        sections["abstract"] = metadata.get("abstract", "")
+        # Language detection runs while the LLM section request is in flight
+        language, _ = await asyncio.gather(self._detect_language(full_text),
+                                           self._infer_sections_with_llm(full_text, sections))
+
+        # Populate abstract if still missing and available in initial metadata
+        if not sections["abstract"] and metadata.get("abstract"):
+            sections["abstract"] = metadata["abstract"]
+
+        return {
+            "metadata": metadata,
+            "full_text": full_text[:self.max_text_length],
+            "sections": sections,
+            "language": language
+        }
+
+    @staticmethod
+    def _load_lid_model(model_path: Optional[str]):
+        """Load the fastText language ID model (e.g. lid.176.ftz), or return None to fall back to langdetect."""
+        if not model_path:
+            return None
+        if not FASTTEXT_AVAILABLE:
+            logger.warning("language_model_path is set but fasttext is not installed. Falling back to langdetect.")
+            return None
+        try:
+            return fasttext.load_model(model_path)
+        except Exception as e:
+            logger.warning(f"Could not load fastText language model {model_path}: {e}. Falling back to langdetect.")
+            return None
+
+    def _predict_language(self, snippet: str) -> Optional[str]:
+        """Run the configured language model (fastText or langdetect) on a snippet."""
+        if self._lid_model is not None:
+            # fastText predicts one line at a time; newlines must be flattened
+            labels, _ = self._lid_model.predict(snippet.replace('\n', ' '), k=1)
+            return labels[0].removeprefix('__label__') if labels else None
+        return detect(snippet)
+
     async def _detect_language(self, text: str) -> Optional[str]:
         """Detect language from text snippet."""
         if not self.language_detection or not text: return None
+        if len(text) < _MIN_LANGUAGE_TEXT_CHARS:
+            logger.debug("Text too short for language detection; skipping.")
+            return None
         try:
-            snippet = text[:min(len(text), 2000)]
-            language = detect(snippet)
+            snippet = text[:_LANGUAGE_SNIPPET_CHARS]
+            # Reprocessed documents and shared boilerplate hit the cache instead of re-running the model.
+            # Keyed by the snippet itself: str hashes are cached, so there is no encode/digest per lookup
+            language = self._language_cache.get(snippet, _MISSING_LANGUAGE)
+            if language is not _MISSING_LANGUAGE:
+                self._language_cache.move_to_end(snippet)
+                logger.debug(f"Language cache hit: {language}")
+                return language
+            # Off the event loop, so detection overlaps with awaits running alongside it (e.g. the LLM request)
+            language = await asyncio.to_thread(self._predict_language, snippet)
+            self._language_cache[snippet] = language
+            if len(self._language_cache) > _LANGUAGE_CACHE_SIZE:
+                self._language_cache.popitem(last=False)
             logger.info(f"Detected language: {language}")
             return language
         except LangDetectException:
@@ -566,30 +1429,24 @@ class PDFProcessor:
         if not text: return metadata
         text_snippet = text[:min(len(text), 5000)]
 
-        # Refine DOI
+        # Refine DOI (almost always on the first page, so look near the top first)
         if not metadata.get("doi"):
-            doi_match = re.search(r'\b(10\.\d{4,9}/[-._;()/:A-Z0-9]+)\b', text_snippet, re.IGNORECASE)
+            doi_match = _search_head_first(_DOI_RE, text_snippet, 2000)
             if doi_match:
                 metadata["doi"] = doi_match.group(1).strip().rstrip('.')
                 logger.info(f"Refined DOI from text: {metadata['doi']}")
 
         # Refine Year
         if not metadata.get("year"):
-            year_context_match = re.search(r'(?:published|received|accepted|©|copyright|\()\s*((?:19|20)\d{2})\b', text_snippet, re.IGNORECASE)
-            year_standalone_match = re.search(r'\b((?:19|20)\d{2})\b', text_snippet[:1000]) # Shorter snippet for standalone
-            if year_context_match:
-                metadata["year"] = year_context_match.group(1)
-                logger.info(f"Refined Year from text context: {metadata['year']}")
-            elif year_standalone_match:
-                metadata["year"] = year_standalone_match.group(1)
-                logger.info(f"Refined Year (standalone) from text: {metadata['year']}")
+            year, in_context = _find_year(text_snippet)
+            if year:
+                metadata["year"] = year
+                if in_context: logger.info(f"Refined Year from text context: {metadata['year']}")
+                else: logger.info(f"Refined Year (standalone) from text: {metadata['year']}")
 
         # Refine Pub Info (Journal, Volume, etc.) - Less reliable regex
         if not metadata.get("journal") or not metadata.get("volume"):
-            pub_match = re.search(
-                r'([A-Za-z\s&]{5,})' r'(?:[,\.]|\s+)' r'(?:Vol\.?|Volume)?\s*(\d+)'
-                r'(?:(?:,\s*|\s+)\(?No\.?|Issue\)?\s*(\d+|\w+))?' r'(?:(?:,\s*|\s+)\(?(?:(?:pp|pages)\.?\s*)?([\d\-–]+)\)?)?'
-                r'(?:(?:,\s*|\s+)\(?((?:19|20)\d{2})\)?)?', text_snippet, re.IGNORECASE | re.MULTILINE)
+            pub_match = _search_pub_info(text_snippet, 2000)
             if pub_match:
                 if not metadata.get("journal"): metadata["journal"] = pub_match.group(1).strip()
                 if not metadata.get("volume"): metadata["volume"] = pub_match.group(2).strip()
@@ -605,64 +1462,121 @@ class PDFProcessor:
         return metadata
 
     async def _parse_sections_from_markdown(self, markdown_text: str) -> Dict[str, str]:
-        """Parse standard sections from markdown text based on headers."""
-        sections = {}
-        current_section_name = None
-        current_content = []
-        misc_content = []
-
-        section_patterns = {
-            "abstract": r'^#+\s*(?:abstract|summary)\s*$',
-            "introduction": r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:introduction|background)\s*$',
-            "related_work": r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:related\s+work|literature\s+review)\s*$',
-            "methodology": r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:method(?:s|ology)?|materials\s+(?:and\s+)?methods|experimental(?:\s+design|\s+setup)?|proposed\s+method|approach|study\s+design)\s*$',
-            "results": r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:results|findings|evaluation|experiments(?:\s+and\s+results)?)\s*$',
-            "discussion": r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:discussion)\s*$',
-            "conclusion": r'^#+\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s*)?(?:conclusion(?:s)?|summary(?: and Future Work)?)\s*$',
-            "references": r'^#+\s*(?:references|bibliography|literature\s+cited)\s*$',
-            "acknowledgements": r'^#+\s*(?:acknowledgements?|acknowledgments?)\s*$',
-            "appendix": r'^#+\s*(?:appendix|appendices|supplementary\s+(?:material|information))\s*$',
-        }
-        key_map = { "related_work": "methodology", "acknowledgements": "conclusion", "appendix": "references" }
+        """
+        Parse standard sections from markdown text based on headers.
 
-        lines = markdown_text.splitlines()
-        for line in lines:
-            matched_section_key = None
-            line_stripped = line.strip()
+        Header lines are found by one _SECTION_HEADER_RE.finditer over the whole text, so body lines never
+        reach Python code; each section's text is then sliced out between header offsets.
+        """
+        if '#' not in markdown_text:
+            # No header can match (e.g. OCR output without markdown structure); everything is 'misc'
+            logger.info("No Markdown headers found; keeping the whole text as 'misc'.")
+            return {"misc": markdown_text.strip()} if markdown_text else {}
 
-            if line_stripped.startswith('#'):
-                for section_key, pattern in section_patterns.items():
-                    if re.match(pattern, line_stripped, re.IGNORECASE):
-                        matched_section_key = section_key
-                        break
-                if matched_section_key:
-                    standard_key = key_map.get(matched_section_key, matched_section_key)
-                    if current_section_name: sections[current_section_name] = "\n".join(current_content).strip()
-                    else: misc_content.extend(current_content) # Content before first known header
-                    current_section_name = standard_key
-                    current_content = [] # Reset content for new section
-                else: # Unmatched header, treat as content
-                    if current_section_name: current_content.append(line)
-                    else: misc_content.append(line)
-            else: # Not a header line
-                if current_section_name: current_content.append(line)
-                else: misc_content.append(line)
+        sections = {}
+        current_section_name = None
+        content_start = 0 # Offset where the current section's content begins
+        misc_end = len(markdown_text) # Content before the first known header is 'misc'
+
+        # Unrecognized headers are not matched and stay part of the surrounding section's content
+        for header_match in _SECTION_HEADER_RE.finditer(markdown_text):
+            matched_section_key = _SECTION_KEYS[header_match.lastindex]
+            standard_key = _SECTION_KEY_MAP.get(matched_section_key, matched_section_key)
+            if current_section_name: sections[current_section_name] = markdown_text[content_start:header_match.start()].strip()
+            else: misc_end = header_match.start()
+            current_section_name = standard_key
+            content_start = header_match.end()
 
         # Save the last section
-        if current_section_name: sections[current_section_name] = "\n".join(current_content).strip()
-        else: misc_content.extend(current_content) # All content was misc
+        if current_section_name: sections[current_section_name] = markdown_text[content_start:].strip()
 
         # Store misc content if any
-        if misc_content: sections["misc"] = "\n".join(misc_content).strip()
+        if misc_end: sections["misc"] = markdown_text[:misc_end].strip()
 
         logger.info(f"Sections identified via Markdown headers: {list(s for s in sections if s != 'misc')}")
         return sections
 
+    def _section_cache_path(self, prompt: str) -> Optional[str]:
+        """Cache file for a section-inference prompt ('<dir>/<2 hex>/<hash>.json'), or None when caching is off."""
+        if not self.section_cache_dir:
+            return None
+        digest = hashlib.blake2b(f"{self.llm_client.model}\0{prompt}".encode('utf-8', 'ignore'), digest_size=20).hexdigest()
+        return os.path.join(self.section_cache_dir, digest[:2], digest + ".json")
+
+    def _read_section_cache(self, cache_path: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response if present and not expired."""
+        try:
+            if self.section_cache_ttl_seconds is not None and time.time() - os.path.getmtime(cache_path) > self.section_cache_ttl_seconds:
+                return None
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            return cached if isinstance(cached, dict) else None
+        except (OSError, ValueError):
+            return None # Missing or unreadable entries are simply cache misses
+
+    @staticmethod
+    def _write_section_cache(cache_path: str, response: Dict[str, Any]) -> None:
+        """Store a response atomically; failures only cost a future cache miss."""
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(response, f)
+            os.replace(tmp_path, cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"Could not write section inference cache {cache_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _recover_sections_locally(text: str, sections: Dict[str, str], sections_to_infer: List[str]) -> List[str]:
+        """
+        Fill sections from header lines found in the text, without the LLM.
+
+        A section is taken from its first header line up to the next recognized header (at most
+        _LOCAL_SECTION_MAX_CHARS characters) and only kept if it is at least 100 characters long.
+
+        Returns:
+            The sections that still need inference.
+        """
+        headers = [(_SECTION_KEYS[m.lastindex], m.start(), m.end()) for m in _PLAIN_SECTION_HEADER_RE.finditer(text)]
+        if not headers:
+            return sections_to_infer
+        remaining = []
+        for section_name in sections_to_infer:
+            content = ""
+            for i, (key, _, end) in enumerate(headers):
+                if key == section_name:
+                    stop = headers[i + 1][1] if i + 1 < len(headers) else len(text)
+                    content = text[end:min(stop, end + _LOCAL_SECTION_MAX_CHARS)].strip()
+                    break
+            if len(content) >= 100:
+                sections[section_name] = content
+                logger.debug(f"Section '{section_name}' recovered locally from a header in the text.")
+            else:
+                remaining.append(section_name)
+        return remaining
+
     async def _infer_sections_with_llm(self, text: str, sections: Dict[str, str]) -> None:
         """Use LLM to infer missing sections or improve section detection."""
-        target_sections = ["abstract", "introduction", "methodology", "results", "discussion", "conclusion"]
         # Infer if section is missing OR has very little content (e.g., < 100 chars)
-        sections_to_infer = [s for s in target_sections if len(sections.get(s, '')) < 100]
+        sections_to_infer = [s for s in _LLM_TARGET_SECTIONS if len(sections.get(s, '')) < 100]
+
+        if sections_to_infer:
+            strong = sum(1 for s in _LLM_TARGET_SECTIONS if len(sections.get(s) or '') >= _STRONG_SECTION_CHARS)
+            if strong >= _STRONG_SECTIONS_SKIP_LLM:
+                self._llm_calls_saved += 1
+                logger.info(f"{strong} of {len(_LLM_TARGET_SECTIONS)} sections parsed with substantial content; treating {sections_to_infer} as absent and skipping LLM inference.")
+                return
+
+        if sections_to_infer and text:
+            sections_to_infer = self._recover_sections_locally(text, sections, sections_to_infer)
+            if not sections_to_infer:
+                self._llm_calls_saved += 1
+                logger.info(f"All missing sections recovered from headers in the text; skipped LLM inference ({self._llm_calls_saved} calls saved so far).")
+                return
 
         if not sections_to_infer or not text:
             logger.debug("Skipping LLM section inference (no sections need inference or no text).")
@@ -671,8 +1585,19 @@ class PDFProcessor:
         logger.info(f"Attempting LLM inference for sections: {sections_to_infer}")
         try:
             text_limit = 50000
-            if len(text) > text_limit:
-                text_snippet = text[:text_limit // 2] + "\n...\n" + text[-text_limit // 2:]
+            text_label = "potentially truncated"
+            # Send only the text after each requested section's heading when every one of them has a heading-like line
+            text_snippet = _section_excerpts(text, sections_to_infer, self.section_window_chars) if self.section_window_chars else None
+            if text_snippet is not None and len(text_snippet) < min(len(text), text_limit):
+                text_label = "excerpts starting at each section's heading"
+                logger.debug(f"Sending {len(text_snippet)} chars of section excerpts to the LLM instead of the full text.")
+            elif len(text) > text_limit:
+                half = text_limit // 2
+                if all(s in _FRONT_SECTIONS for s in sections_to_infer):
+                    text_snippet = text[:half] # Front matter only needs the head; the tail would just add prompt tokens
+                    text_label = "beginning of the paper"
+                else:
+                    text_snippet = f"{text[:half]}\n...\n{text[-half:]}"
             else: text_snippet = text
 
             section_prompt = f"""
@@ -680,13 +1605,25 @@ Analyze the following scientific paper text and extract the content for ONLY the
 If a section listed above is clearly not present in the text, provide an empty string "" for its value.
 Focus on capturing the core content for each requested section accurately and completely.
 
-Paper Text (potentially truncated):
+Paper Text ({text_label}):
 {text_snippet}
 
 Respond ONLY with a valid JSON object where the keys are the section names ({', '.join(sections_to_infer)}) and the values are the extracted text strings for each section.
 Example for missing 'results': {{"introduction": "...", "results": ""}}
 """
-            llm_extracted_sections = await self.llm_client.extract_json(section_prompt)
+            # Responses are content-addressed by model + prompt, so reprocessing a PDF skips the LLM round trip
+            cache_path = self._section_cache_path(section_prompt)
+            llm_extracted_sections = await asyncio.to_thread(self._read_section_cache, cache_path) if cache_path else None
+            if llm_extracted_sections is not None:
+                logger.info("Using cached LLM section inference response.")
+            else:
+                if self._section_batcher is not None:
+                    # Shares one request with other PDFs being processed concurrently; None means ask separately
+                    llm_extracted_sections = await self._section_batcher.infer(text_snippet, sections_to_infer)
+                if llm_extracted_sections is None:
+                    llm_extracted_sections = await self.llm_client.extract_json(section_prompt)
+                if cache_path and isinstance(llm_extracted_sections, dict):
+                    await asyncio.to_thread(self._write_section_cache, cache_path, llm_extracted_sections)
 
             if isinstance(llm_extracted_sections, dict):
                 for section_name, llm_content in llm_extracted_sections.items():
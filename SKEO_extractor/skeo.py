@@ -45,10 +45,12 @@ logging.basicConfig(
 logger = logging.getLogger('skeo.main')
 
 # --- Helper Function for Safe Filename ---
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\-.]+')
+
 def create_safe_filename_base(filename: str) -> str:
     """Removes extension and makes the filename safe for filesystem paths."""
     base = os.path.splitext(filename)[0]
-    safe_base = re.sub(r'[^\w\-.]+', '_', base)
+    safe_base = _UNSAFE_FILENAME_CHARS_RE.sub('_', base)
     return safe_base
 
 async def main():
@@ -209,146 +211,154 @@ async def main():
          sys.exit(1)
 
 
-    # --- Pre-check Strapi Connection/Endpoints (if uploading) ---
-    # (Strapi logic remains the same)
-    strapi_ok = True
-    direct_upload_enabled = params.get("strapi", {}).get("direct_upload", False)
-
-    if direct_upload_enabled:
-        # Check if the extractor initialized the strapi_client correctly
-        if not extractor.strapi_client:
-             logger.error("Direct upload enabled but Strapi client failed to initialize (check params/token).")
-             strapi_ok = False
-        else:
-             logger.info("Direct upload enabled. Testing Strapi connection...")
-             if not await extractor.strapi_client.test_connection():
-                  strapi_ok = False
-             elif params.get("strapi", {}).get("test_endpoints", True):
-                  logger.info("Testing Strapi endpoints...")
-                  endpoint_status = await extractor.strapi_client.test_all_endpoints()
-                  # Check if any endpoint failed
-                  if any(status["status"] == "error" for status in endpoint_status.values()):
-                       strapi_ok = False
-
-        if not strapi_ok and params.get("processing", {}).get("fail_fast", False):
-            logger.error("Strapi connection or endpoint check failed and fail_fast is enabled. Exiting.")
-            sys.exit(1)
-        elif not strapi_ok:
-             logger.warning("Strapi connection or endpoint check failed. Direct upload might fail for processed files.")
+    try:
+        # --- Pre-check Strapi Connection/Endpoints (if uploading) ---
+        # (Strapi logic remains the same)
+        strapi_ok = True
+        direct_upload_enabled = params.get("strapi", {}).get("direct_upload", False)
+
+        if direct_upload_enabled:
+            # Check if the extractor initialized the strapi_client correctly
+            if not extractor.strapi_client:
+                 logger.error("Direct upload enabled but Strapi client failed to initialize (check params/token).")
+                 strapi_ok = False
+            else:
+                 logger.info("Direct upload enabled. Testing Strapi connection...")
+                 if not await extractor.strapi_client.test_connection():
+                      strapi_ok = False
+                 elif params.get("strapi", {}).get("test_endpoints", True):
+                      logger.info("Testing Strapi endpoints...")
+                      endpoint_status = await extractor.strapi_client.test_all_endpoints()
+                      # Check if any endpoint failed
+                      if any(status["status"] == "error" for status in endpoint_status.values()):
+                           strapi_ok = False
+
+            if not strapi_ok and params.get("processing", {}).get("fail_fast", False):
+                logger.error("Strapi connection or endpoint check failed and fail_fast is enabled. Exiting.")
+                sys.exit(1)
+            elif not strapi_ok:
+                 logger.warning("Strapi connection or endpoint check failed. Direct upload might fail for processed files.")
+            else:
+                 logger.info("Strapi connection and endpoints check successful.")
+
+
+        # --- Process PDFs Concurrently using asyncio ---
+        processing_params = params.get("processing", {})
+        fail_fast = processing_params.get("fail_fast", False)
+        concurrency_limit = processing_params.get("max_workers", 1)
+        logger.info(f"Processing PDFs with concurrency limit: {concurrency_limit}")
+
+        # Load Docling models once before any PDF starts
+        await extractor.pdf_processor.warm_up()
+
+        # Optionally warm the SerpApi cache for the whole batch with concurrent, de-duplicated lookups
+        if params.get("pdf", {}).get("prefetch_metadata", False):
+            await extractor.pdf_processor.prefetch_metadata([str(pdf_path) for pdf_path, _ in files_to_process])
+
+        output_paths = {str(pdf_path): output_path for pdf_path, output_path in files_to_process}
+
+        async def process_one(pdf_path_str: str):
+             """Run process_pdf for one input PDF with its output path; always returns (input_path_str, outcome)."""
+             pdf_path = Path(pdf_path_str)
+             pdf_display_name = pdf_path.relative_to(input_pdf_dir) # For logging
+             try:
+                  # Pass both the input PDF path and the calculated output JSON path
+                  # Ensure SKEOExtractor.process_pdf expects these arguments!
+                  result = await extractor.process_pdf(pdf_path, output_paths[pdf_path_str])
+             except Exception as task_exc:
+                  logger.error(f"Caught unexpected exception directly from process_pdf task for {pdf_display_name}: {task_exc}", exc_info=True)
+                  # Return the *input* path and the exception
+                  result = (pdf_path_str, task_exc)
+
+             # Ensure result is a tuple (path_str, outcome) even on direct exception
+             if isinstance(result, tuple) and len(result) == 2:
+                  # SKEOExtractor.process_pdf should ideally return (str(pdf_path), outcome)
+                  # Ensure the first element is the *original input pdf path* as a string
+                  if result[0] != pdf_path_str:
+                       logger.warning(f"Path mismatch in process_pdf result for {pdf_display_name}. Expected {pdf_path}, got {result[0]}. Correcting.")
+                       result = (pdf_path_str, result[1])
+                  return result
+             else:
+                  # If process_pdf failed unexpectedly or returned wrong format
+                  logger.error(f"Unexpected return type '{type(result)}' from process_pdf for {pdf_display_name}. Wrapping in error tuple.")
+                  return (pdf_path_str, Exception(f"Unexpected return type from process_pdf: {type(result)}"))
+
+        # A fixed set of max_workers workers runs the PDFs in input order, reading each upcoming PDF ahead into
+        # the page cache and isolating failures per file; results come back as (input_path, outcome) in input order
+        batch_results = await extractor.pdf_processor.process_batch(
+            list(output_paths), concurrency=concurrency_limit, process=process_one)
+        results = [outcome for _, outcome in batch_results]
+
+        # --- Process Results ---
+        success_count = 0
+        error_count = 0
+        processed_input_paths = [str(paths[0]) for paths in files_to_process] # Get input paths as strings
+
+        for i, result_item in enumerate(results):
+             pdf_input_path_str = processed_input_paths[i] # Get corresponding input path string
+             pdf_display_name = Path(pdf_input_path_str).relative_to(input_pdf_dir) # For logging
+
+             if isinstance(result_item, Exception):
+                  # This catches exceptions that escaped the per-PDF wrapper (isolated by process_batch)
+                  error_count += 1
+                  logger.error(f"System error during processing task for {pdf_display_name}: {result_item}", exc_info=result_item)
+                  if fail_fast:
+                       logger.error("Fail fast enabled. Exiting due to system error.")
+                       sys.exit(1)
+             elif isinstance(result_item, tuple) and len(result_item) == 2:
+                  processed_path_str, outcome = result_item
+                  # Sanity check path matches input string (should match due to wrapper logic)
+                  if processed_path_str != pdf_input_path_str:
+                       logger.warning(f"Path mismatch in results? Input: {pdf_input_path_str}, Output tuple path: {processed_path_str}")
+                       # Trust the index for associating with the original file
+                       processed_path_str = pdf_input_path_str
+
+                  if isinstance(outcome, Exception):
+                       # This catches exceptions returned *by* process_pdf or the wrapper
+                       error_count += 1
+                       # Error should have been logged within process_pdf or its sub-methods/wrapper
+                       logger.error(f"Failed to process {pdf_display_name}. See previous logs for details (Exception: {outcome}).")
+                       if fail_fast:
+                            logger.error(f"Fail fast enabled. Exiting due to processing error for {pdf_display_name}.")
+                            sys.exit(1)
+                  elif isinstance(outcome, dict):
+                       # Success case, outcome is the extracted data dict
+                       success_count += 1
+                       logger.info(f"Successfully processed: {pdf_display_name}")
+                       # Specific success details (like output path) should be logged within process_pdf
+                  else:
+                       # Unexpected outcome type from process_pdf
+                       error_count += 1
+                       logger.error(f"Unexpected outcome type '{type(outcome)}' for {pdf_display_name}")
+                       if fail_fast: sys.exit(1)
+             else:
+                  # Unexpected result format from the batch
+                  error_count += 1
+                  logger.error(f"Unexpected result format from batch processing for {pdf_display_name}: {result_item}")
+                  if fail_fast: sys.exit(1)
+
+
+        # --- Final Summary ---
+        logger.info("-" * 20)
+        logger.info("SKEO Extraction Summary:")
+        logger.info(f"  Input directory scanned: {input_pdf_dir}")
+        logger.info(f"  Output base directory: {output_base_dir}")
+        logger.info(f"  Total PDFs found: {found_count}")
+        logger.info(f"  Skipped (output exists): {skipped_count}")
+        logger.info(f"  Attempted processing: {len(files_to_process)}")
+        logger.info(f"  Successfully processed: {success_count}")
+        logger.info(f"  Failed: {error_count}")
+        logger.info("-" * 20)
+
+        if error_count > 0:
+             logger.warning("Some PDFs failed processing. Check log file 'skeo_extraction.log' for detailed errors.")
+             sys.exit(1) # Exit with error code if any PDF failed
         else:
-             logger.info("Strapi connection and endpoints check successful.")
-
-
-    # --- Process PDFs Concurrently using asyncio ---
-    processing_params = params.get("processing", {})
-    fail_fast = processing_params.get("fail_fast", False)
-    concurrency_limit = processing_params.get("max_workers", 1)
-    semaphore = asyncio.Semaphore(concurrency_limit)
-    logger.info(f"Processing PDFs with concurrency limit: {concurrency_limit}")
-
-    async def process_with_semaphore(pdf_path: Path, output_path: Path):
-         """Wrapper to run process_pdf with semaphore and pass output path."""
-         async with semaphore:
-              pdf_display_name = pdf_path.relative_to(input_pdf_dir) # For logging
-              logger.debug(f"Acquired semaphore for {pdf_display_name}")
-              try:
-                   # --- MODIFIED CALL ---
-                   # Pass both the input PDF path and the calculated output JSON path
-                   # Ensure SKEOExtractor.process_pdf expects these arguments!
-                   result = await extractor.process_pdf(pdf_path, output_path)
-              except Exception as task_exc:
-                   logger.error(f"Caught unexpected exception directly from process_pdf task for {pdf_display_name}: {task_exc}", exc_info=True)
-                   # Return the *input* path and the exception
-                   result = (str(pdf_path), task_exc)
-              logger.debug(f"Released semaphore for {pdf_display_name}")
-
-              # Ensure result is a tuple (path_str, outcome) even on direct exception
-              if isinstance(result, tuple) and len(result) == 2:
-                   # SKEOExtractor.process_pdf should ideally return (str(pdf_path), outcome)
-                   # Ensure the first element is the *original input pdf path* as a string
-                   if result[0] != str(pdf_path):
-                        logger.warning(f"Path mismatch in process_pdf result for {pdf_display_name}. Expected {pdf_path}, got {result[0]}. Correcting.")
-                        result = (str(pdf_path), result[1])
-                   return result
-              else:
-                   # If process_pdf failed unexpectedly or returned wrong format
-                   logger.error(f"Unexpected return type '{type(result)}' from process_pdf for {pdf_display_name}. Wrapping in error tuple.")
-                   return (str(pdf_path), Exception(f"Unexpected return type from process_pdf: {type(result)}"))
-
-
-    # Create tasks with both input and output paths
-    tasks = [process_with_semaphore(pdf_path, output_path) for pdf_path, output_path in files_to_process]
-
-    # Execute tasks and gather results
-    results = await asyncio.gather(*tasks, return_exceptions=True) # Handles internal asyncio errors
-
-    # --- Process Results ---
-    success_count = 0
-    error_count = 0
-    processed_input_paths = [str(paths[0]) for paths in files_to_process] # Get input paths as strings
-
-    for i, result_item in enumerate(results):
-         pdf_input_path_str = processed_input_paths[i] # Get corresponding input path string
-         pdf_display_name = Path(pdf_input_path_str).relative_to(input_pdf_dir) # For logging
-
-         if isinstance(result_item, Exception):
-              # This catches exceptions from asyncio.gather itself or the semaphore wrapper
-              error_count += 1
-              logger.error(f"System error during processing task for {pdf_display_name}: {result_item}", exc_info=result_item)
-              if fail_fast:
-                   logger.error("Fail fast enabled. Exiting due to system error.")
-                   sys.exit(1)
-         elif isinstance(result_item, tuple) and len(result_item) == 2:
-              processed_path_str, outcome = result_item
-              # Sanity check path matches input string (should match due to wrapper logic)
-              if processed_path_str != pdf_input_path_str:
-                   logger.warning(f"Path mismatch in results? Input: {pdf_input_path_str}, Output tuple path: {processed_path_str}")
-                   # Trust the index for associating with the original file
-                   processed_path_str = pdf_input_path_str
-
-              if isinstance(outcome, Exception):
-                   # This catches exceptions returned *by* process_pdf or the wrapper
-                   error_count += 1
-                   # Error should have been logged within process_pdf or its sub-methods/wrapper
-                   logger.error(f"Failed to process {pdf_display_name}. See previous logs for details (Exception: {outcome}).")
-                   if fail_fast:
-                        logger.error(f"Fail fast enabled. Exiting due to processing error for {pdf_display_name}.")
-                        sys.exit(1)
-              elif isinstance(outcome, dict):
-                   # Success case, outcome is the extracted data dict
-                   success_count += 1
-                   logger.info(f"Successfully processed: {pdf_display_name}")
-                   # Specific success details (like output path) should be logged within process_pdf
-              else:
-                   # Unexpected outcome type from process_pdf
-                   error_count += 1
-                   logger.error(f"Unexpected outcome type '{type(outcome)}' for {pdf_display_name}")
-                   if fail_fast: sys.exit(1)
-         else:
-              # Unexpected result format from gather
-              error_count += 1
-              logger.error(f"Unexpected result format from asyncio.gather for {pdf_display_name}: {result_item}")
-              if fail_fast: sys.exit(1)
-
-
-    # --- Final Summary ---
-    logger.info("-" * 20)
-    logger.info("SKEO Extraction Summary:")
-    logger.info(f"  Input directory scanned: {input_pdf_dir}")
-    logger.info(f"  Output base directory: {output_base_dir}")
-    logger.info(f"  Total PDFs found: {found_count}")
-    logger.info(f"  Skipped (output exists): {skipped_count}")
-    logger.info(f"  Attempted processing: {len(files_to_process)}")
-    logger.info(f"  Successfully processed: {success_count}")
-    logger.info(f"  Failed: {error_count}")
-    logger.info("-" * 20)
-
-    if error_count > 0:
-         logger.warning("Some PDFs failed processing. Check log file 'skeo_extraction.log' for detailed errors.")
-         sys.exit(1) # Exit with error code if any PDF failed
-    else:
-         logger.info("All planned PDFs processed successfully.")
-         sys.exit(0) # Exit cleanly
+             logger.info("All planned PDFs processed successfully.")
+             sys.exit(0) # Exit cleanly
+    finally:
+        # Close shared HTTP sessions (also runs on sys.exit, which raises SystemExit)
+        await extractor.close()
 
 
 if __name__ == "__main__":
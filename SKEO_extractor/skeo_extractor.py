@@ -77,6 +77,11 @@ class SKEOExtractor:
             if comp not in self.schema_models:
                 logger.warning(f"Component '{comp}' configured for extraction, but no matching Pydantic model found in self.schema_models.")
 
+    async def close(self):
+        """Release resources held by the clients (shared HTTP sessions, cached Docling converters)."""
+        await self.llm_client.close()
+        await self.metadata_fetcher.aclose()
+        self.pdf_processor.close()
 
     def _generate_id(self) -> str:
         """Generate a unique string ID (UUID)."""
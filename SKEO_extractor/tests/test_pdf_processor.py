@@ -0,0 +1,28 @@
+# test_pdf_processor.py - Section header matching in plain (PyMuPDF) text
+
+import os
+import sys
+
+import pytest
+
+# pdf_processor imports these at module level (directly or through its sibling modules)
+for _module in ("pymupdf", "aiohttp", "tenacity", "pydantic"):
+    pytest.importorskip(_module)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_processor import PDFProcessor, _PLAIN_SECTION_HEADER_RE  # noqa: E402
+
+def test_plain_header_does_not_start_on_preceding_number_line():
+    # A bare page-number line directly above a heading must stay with the previous section
+    text = "Abstract\n" + "a" * 150 + "\n3\nIntroduction\n" + "b" * 150 + "\n"
+
+    header = next(m for m in _PLAIN_SECTION_HEADER_RE.finditer(text) if m.lastgroup == "introduction")
+    assert header.group() == "Introduction"
+    assert text[header.start() - 2:header.start()] == "3\n"
+
+    sections = {}
+    remaining = PDFProcessor._recover_sections_locally(text, sections, ["abstract", "introduction"])
+    assert remaining == []
+    assert sections["abstract"].endswith("\n3")
+    assert sections["introduction"] == "b" * 150
@@ -0,0 +1,91 @@
+# test_section_batcher.py - Sharing one LLM section-inference call across concurrent PDFs
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# pdf_processor imports these at module level (directly or through its sibling modules)
+for _module in ("pymupdf", "aiohttp", "tenacity", "pydantic", "certifi"):
+    pytest.importorskip(_module)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_processor import _SectionInferenceBatcher  # noqa: E402
+
+class _StubLLMClient:
+    """Records extract_json prompts and answers with a fixed response (or raises it, if it is an exception)."""
+
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    async def extract_json(self, prompt):
+        self.prompts.append(prompt)
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+def _run_concurrently(batcher, *requests):
+    """Start batcher.infer for each (text, sections) request at once and return their results in order."""
+    async def _main():
+        return await asyncio.gather(*(batcher.infer(text, sections) for text, sections in requests))
+    return asyncio.run(_main())
+
+def test_full_batch_is_sent_once_and_split_per_document():
+    llm = _StubLLMClient({"doc1": {"introduction": "intro one"}, "doc2": {"results": "results two"}})
+    batcher = _SectionInferenceBatcher(llm, max_docs=2, max_chars=1000, wait_seconds=10)
+
+    results = _run_concurrently(batcher, ("first paper", ["introduction"]), ("second paper", ["results"]))
+
+    assert results == [{"introduction": "intro one"}, {"results": "results two"}]
+    assert len(llm.prompts) == 1
+    assert "=== Document doc1 (sections: introduction) ===\nfirst paper" in llm.prompts[0]
+    assert "=== Document doc2 (sections: results) ===\nsecond paper" in llm.prompts[0]
+
+def test_request_alone_when_timer_fires_gets_none_without_llm_call():
+    llm = _StubLLMClient({"doc1": {"introduction": "unused"}})
+    batcher = _SectionInferenceBatcher(llm, max_docs=4, max_chars=1000, wait_seconds=0.01)
+
+    assert _run_concurrently(batcher, ("only paper", ["introduction"])) == [None]
+    assert llm.prompts == []
+
+def test_oversized_text_is_not_batched():
+    llm = _StubLLMClient({"doc1": {"introduction": "unused"}})
+    batcher = _SectionInferenceBatcher(llm, max_docs=2, max_chars=10, wait_seconds=0.01)
+
+    assert _run_concurrently(batcher, ("x" * 11, ["introduction"])) == [None]
+    assert llm.prompts == []
+
+def test_character_limit_flushes_pending_requests_first():
+    llm = _StubLLMClient({"doc1": {"introduction": "a"}, "doc2": {"introduction": "b"}})
+    batcher = _SectionInferenceBatcher(llm, max_docs=10, max_chars=10, wait_seconds=0.01)
+
+    # The third request would exceed max_chars, so the first two go out together and it waits alone
+    results = _run_concurrently(batcher, ("aaaa", ["introduction"]), ("bbbb", ["introduction"]), ("cccc", ["introduction"]))
+
+    assert results == [{"introduction": "a"}, {"introduction": "b"}, None]
+    assert len(llm.prompts) == 1
+    assert "cccc" not in llm.prompts[0]
+
+def test_failed_call_returns_none_for_every_document():
+    llm = _StubLLMClient(RuntimeError("LLM unavailable"))
+    batcher = _SectionInferenceBatcher(llm, max_docs=2, max_chars=1000, wait_seconds=10)
+
+    assert _run_concurrently(batcher, ("p1", ["introduction"]), ("p2", ["results"])) == [None, None]
+    assert len(llm.prompts) == 1
+
+def test_unparseable_response_returns_none_for_every_document():
+    llm = _StubLLMClient(None) # LLMClient.extract_json returns None when extraction fails definitively
+    batcher = _SectionInferenceBatcher(llm, max_docs=2, max_chars=1000, wait_seconds=10)
+
+    assert _run_concurrently(batcher, ("p1", ["introduction"]), ("p2", ["results"])) == [None, None]
+
+def test_missing_or_malformed_document_entry_returns_none_for_that_document():
+    llm = _StubLLMClient({"doc1": {"introduction": "intro"}, "doc3": "not an object"})
+    batcher = _SectionInferenceBatcher(llm, max_docs=3, max_chars=1000, wait_seconds=10)
+
+    results = _run_concurrently(batcher, ("p1", ["introduction"]), ("p2", ["results"]), ("p3", ["discussion"]))
+
+    assert results == [{"introduction": "intro"}, None, None]
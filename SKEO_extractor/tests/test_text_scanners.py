@@ -0,0 +1,138 @@
+# test_text_scanners.py - The rewritten text scanners must find what a plain pattern.search finds
+
+import asyncio
+import os
+import random
+import re
+import sys
+
+import pytest
+
+# pdf_processor imports these at module level (directly or through its sibling modules)
+for _module in ("pymupdf", "aiohttp", "tenacity", "pydantic", "certifi"):
+    pytest.importorskip(_module)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_processor import (  # noqa: E402
+    PDFProcessor, _DOI_RE, _PLAIN_SECTION_HEADER_RE, _PUB_RE, _SECTION_HEADER_RE, _SECTION_KEY_MAP, _SECTION_KEYS,
+    _SECTION_PATTERNS, _STANDALONE_YEAR_CHARS, _find_year, _search_head_first, _search_pub_info,
+)
+
+# The separate searches _find_year replaced
+_YEAR_CONTEXT_RE = re.compile(r'(?:published|received|accepted|©|copyright|\()\s*((?:19|20)\d{2})\b', re.IGNORECASE)
+_STANDALONE_YEAR_RE = re.compile(r'\b((?:19|20)\d{2})\b')
+
+def _random_text(rng, tokens, max_tokens):
+    return "".join(rng.choice(tokens) for _ in range(rng.randint(0, max_tokens)))
+
+def _same_match(actual, expected):
+    if expected is None:
+        return actual is None
+    return actual is not None and actual.span() == expected.span() and actual.groups() == expected.groups()
+
+def test_search_head_first_matches_full_search():
+    rng = random.Random(1)
+    tokens = ("10.", "1234", "5678/", "ab", "-", ".", " ", "\n", ";", "(", ")", "x")
+    for _ in range(5000):
+        text = _random_text(rng, tokens, 30)
+        for head_len in (0, 1, 5, 10, 20, len(text), len(text) + 1):
+            assert _same_match(_search_head_first(_DOI_RE, text, head_len), _DOI_RE.search(text)), (text, head_len)
+
+def test_search_head_first_does_not_return_a_match_truncated_at_the_cut_off():
+    text = "doi 10.1234/abcdef"
+    assert _DOI_RE.search(text, 0, 14).group(1) == "10.1234/ab" # What a bounded scan alone would report
+    assert _search_head_first(_DOI_RE, text, 14).group(1) == "10.1234/abcdef"
+    # Cut inside "-)", the bounded match backtracks to the boundary after "1234" and ends before the cut-off
+    text = "10.5678/(-10.)1234-)(12345678/x); more"
+    assert _DOI_RE.search(text, 0, 20).end() == 18
+    assert _search_head_first(_DOI_RE, text, 20).group(1) == "10.5678/(-10.)1234-)(12345678/x"
+
+def test_search_pub_info_matches_pub_re_search():
+    rng = random.Random(2)
+    tokens = ("Journal", " of ", "Science", "&", " ", "\n", ",", ".", "Vol.", "Volume ", "12", "No.", "Issue",
+              "(", ")", "pp.", "pages ", "1-10", "–", "1999", "2021", "ab", "x")
+    for _ in range(5000):
+        text = _random_text(rng, tokens, 25)
+        expected = _PUB_RE.search(text)
+        assert _same_match(_search_pub_info(text), expected), text
+        for head_len in (1, 10, 30, len(text)):
+            assert _same_match(_search_pub_info(text, head_len), expected), (text, head_len)
+
+def _year_by_separate_searches(text):
+    context_match = _YEAR_CONTEXT_RE.search(text)
+    if context_match:
+        return context_match.group(1), True
+    standalone_match = _STANDALONE_YEAR_RE.search(text, 0, _STANDALONE_YEAR_CHARS)
+    return (standalone_match.group(1) if standalone_match else None), False
+
+def test_find_year_matches_separate_searches():
+    rng = random.Random(3)
+    tokens = ("published ", "Received:", "accepted", "©", "Copyright ", "(", ")", "1999", "2020", "1899", "20201",
+              " ", "\n", "x", "ab", "-", ",")
+    for _ in range(5000):
+        text = _random_text(rng, tokens, 25)
+        assert _find_year(text) == _year_by_separate_searches(text), text
+
+def test_find_year_standalone_cut_off_edge():
+    padding = "x " * (_STANDALONE_YEAR_CHARS // 2)
+    assert _find_year(padding[:-5] + " 2019 text") == ("2019", False) # Ends exactly at the cut-off
+    assert _find_year(padding[:-4] + " 2019 text") == (None, False) # Ends one character past it
+    assert _find_year(padding + "Published 2019") == ("2019", True) # Keyword years are found anywhere
+    # A longer number cut by the limit is not a year; the old endpos-bounded search reported its first four digits
+    truncated = padding[:-5] + " 20191"
+    assert _year_by_separate_searches(truncated) == ("2019", False)
+    assert _find_year(truncated) == (None, False)
+
+_HEADER_LINE_TOKENS = ("#", "## ", "### ", " ", "\t", "1. ", "2.3 ", "Abstract", "SUMMARY", "Introduction",
+                       "background", "Related Work", "Methods", "materials and methods", "Results", "Discussion",
+                       "Conclusions", "Summary and Future Work", "References", "Acknowledgments", "Appendix",
+                       "Experimental Setup", "Findings", "text", "3")
+
+def _random_document(rng):
+    lines = [_random_text(rng, _HEADER_LINE_TOKENS, 4) for _ in range(rng.randint(0, 12))]
+    return "\n".join(lines) + rng.choice(("", "\n"))
+
+def _header_lines_by_pattern(text, header_prefix):
+    """(line offset, section key) of each line whose stripped text matches a section pattern, first pattern winning."""
+    patterns = [(key, re.compile(pattern.replace(r'^#+\s*', header_prefix, 1), re.IGNORECASE)) for key, pattern in _SECTION_PATTERNS]
+    headers, offset = [], 0
+    for line in text.split("\n"):
+        key = next((key for key, pattern in patterns if pattern.match(line.strip(" \t"))), None)
+        if key:
+            headers.append((offset, key))
+        offset += len(line) + 1
+    return headers
+
+def test_section_header_regexes_match_per_pattern_search():
+    rng = random.Random(4)
+    for _ in range(3000):
+        text = _random_document(rng)
+        for regex, header_prefix in ((_SECTION_HEADER_RE, r'^#+\s*'), (_PLAIN_SECTION_HEADER_RE, r'^(?:#+\s*)?')):
+            found = [(m.start(), _SECTION_KEYS[m.lastindex]) for m in regex.finditer(text)]
+            assert found == _header_lines_by_pattern(text, header_prefix), (text, regex.pattern[:20])
+            assert all(_SECTION_KEYS[m.lastindex] == m.lastgroup for m in regex.finditer(text))
+
+def _sections_by_line(markdown_text):
+    """Line-by-line section split that _parse_sections_from_markdown replaced."""
+    sections, misc_content, current_content, current_section_name = {}, [], [], None
+    for line in markdown_text.splitlines():
+        header = _header_lines_by_pattern(line, r'^#+\s*') if line.strip().startswith('#') else []
+        if header:
+            if current_section_name: sections[current_section_name] = "\n".join(current_content).strip()
+            else: misc_content.extend(current_content)
+            current_section_name = _SECTION_KEY_MAP.get(header[0][1], header[0][1])
+            current_content = []
+        else:
+            current_content.append(line)
+    if current_section_name: sections[current_section_name] = "\n".join(current_content).strip()
+    else: misc_content.extend(current_content)
+    if misc_content: sections["misc"] = "\n".join(misc_content).strip()
+    return sections
+
+def test_parse_sections_from_markdown_matches_line_by_line_split():
+    rng = random.Random(5)
+    for _ in range(3000):
+        text = _random_document(rng)
+        # The method does not use the instance
+        assert asyncio.run(PDFProcessor._parse_sections_from_markdown(None, text)) == _sections_by_line(text), text